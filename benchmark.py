@@ -0,0 +1,115 @@
+import argparse
+import datetime
+import json
+import platform
+import time
+import numpy as np
+
+from travlingsalesperson import CROSSOVER_OPERATORS, MUTATION_KICKS, MUTATION_MOVES, SELECTION_METHODS, Environment, Population
+
+"""Timing harness for the GA hot paths. Runs headless, every case starts
+from the same seed, and results can be saved as JSON and compared with an
+earlier run:
+
+    python benchmark.py --output before.json
+    python benchmark.py --compare before.json
+"""
+
+def time_case(function, repeats, seed, population):
+    timings = []
+    for repeat in range(repeats):
+        population.rng = np.random.default_rng([seed, repeat])
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return {"best": min(timings), "mean": sum(timings) / len(timings), "repeats": repeats}
+
+def benchmark_cases(population, crossover_pairs):
+    """Yields (name, function) for every timed operation on a population."""
+    tours, costs, positions = population.tours.copy(), population.costs.copy(), population.positions.copy()
+
+    def restore():
+        #Operations that change the population in place start from the same state every repeat
+        population.tours[:] = tours
+        population.costs[:] = costs
+        population.positions[:] = positions
+
+    yield "evaluate_all", population.evaluate_all
+    for name in sorted(CROSSOVER_OPERATORS):
+        operator = CROSSOVER_OPERATORS[name]
+        pairs = [(tours[index % len(tours)], tours[(index + 1) % len(tours)]) for index in range(crossover_pairs)]
+        yield "crossover/" + name, lambda operator=operator, pairs=pairs: [operator(parent_A, parent_B, population.rng) for parent_A, parent_B in pairs]
+    for name in sorted(MUTATION_MOVES) + ["scramble"] + sorted(MUTATION_KICKS):
+        yield "mutate/" + name, lambda name=name: (restore(), population.mutate(0.15, name))
+    for name in sorted(SELECTION_METHODS):
+        population.selection_method = SELECTION_METHODS[name]
+        yield "select_parents/" + name, lambda: population.select_parents(4)
+    population.selection_method = SELECTION_METHODS["tournament"]
+
+    def generation():
+        restore()
+        population.next_generation(0.15)
+    yield "generation", generation
+
+def run(node_counts, population_sizes, repeats, seed, crossover_pairs):
+    results = []
+    for node_count in node_counts:
+        environment = Environment(node_count, 800, 800, rng = seed)
+        for population_size in population_sizes:
+            population = Population(population_size, environment, rng = seed)
+            for name, function in benchmark_cases(population, crossover_pairs):
+                result = time_case(function, repeats, seed, population)
+                result.update({"name": name, "nodes": node_count, "population": population_size})
+                results.append(result)
+                print(name.ljust(28), str(node_count).rjust(6), str(population_size).rjust(6), "%10.6f s" % result["best"])
+    return results
+
+def compare(results, baseline, tolerance):
+    """Prints the best time of every case against the baseline run, returns the number of regressions."""
+    previous = {(result["name"], result["nodes"], result["population"]): result for result in baseline["results"]}
+    regressions = 0
+    for result in results:
+        key = (result["name"], result["nodes"], result["population"])
+        if key not in previous:
+            continue
+        ratio = result["best"] / previous[key]["best"] if previous[key]["best"] > 0 else float("inf")
+        flag = ""
+        if ratio > tolerance:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(key[0].ljust(28), str(key[1]).rjust(6), str(key[2]).rjust(6), "%7.2fx" % ratio + flag)
+    return regressions
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark the genetic algorithm operators")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[25, 200, 1000, 10000])
+    parser.add_argument("--populations", type=int, nargs="+", default=[30, 300])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--crossover-pairs", type=int, default=20, help="children bred per crossover timing")
+    parser.add_argument("--output", metavar="PATH", default=None, help="save results as JSON")
+    parser.add_argument("--compare", metavar="PATH", default=None, help="compare against a saved JSON run")
+    parser.add_argument("--tolerance", type=float, default=1.10, help="slowdown ratio reported as a regression")
+    return parser.parse_args()
+
+def main():
+    arguments = parse_arguments()
+    results = run(arguments.nodes, arguments.populations, arguments.repeats, arguments.seed, arguments.crossover_pairs)
+    if arguments.output is not None:
+        with open(arguments.output, "w") as file:
+            json.dump({
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "seed": arguments.seed,
+                "results": results,
+            }, file, indent=1)
+    if arguments.compare is not None:
+        with open(arguments.compare) as file:
+            baseline = json.load(file)
+        if compare(results, baseline, arguments.tolerance):
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
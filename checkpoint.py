@@ -0,0 +1,89 @@
+import json
+import os
+import numpy as np
+
+"""Saving and restoring the full state of a solver run as one .npz file.
+A checkpoint holds the tours, costs, Generator state, hall of fame and
+fitness cache of a Population together with the generation counter, cost
+history and solver settings, enough for a resumed run to continue exactly
+as the interrupted one would have.
+"""
+
+CHECKPOINT_VERSION = 1
+
+def save_checkpoint(path, population, generation, cost_history, settings):
+    """Writes the state of population after generation generations to path."""
+    hall_of_fame = population.hall_of_fame
+    node_count = population.tours.shape[1]
+    hall_of_fame_tours = [hall_of_fame.tours[key] for cost, entry_counter, key in hall_of_fame.heap]
+    arrays = {
+        "version": np.array(CHECKPOINT_VERSION),
+        "generation": np.array(generation),
+        "settings": np.array(json.dumps(settings)),
+        "environment": np.array(population.environment.fingerprint()),
+        "rng_state": np.array(json.dumps(population.rng.bit_generator.state)),
+        "tours": population.tours,
+        "costs": population.costs,
+        "cost_history": np.array(cost_history[:generation], dtype=np.float64),
+        "evaluation_count": np.array(population.evaluation_count),
+        #The heap is stored in list order so the restored heap breaks ties exactly like the saved one
+        "hall_of_fame_size": np.array(hall_of_fame.size),
+        "hall_of_fame_entry_counter": np.array(hall_of_fame.entry_counter),
+        "hall_of_fame_costs": np.array([cost for cost, entry_counter, key in hall_of_fame.heap], dtype=np.float64),
+        "hall_of_fame_counters": np.array([entry_counter for cost, entry_counter, key in hall_of_fame.heap], dtype=np.int64),
+        "hall_of_fame_tours": np.array(hall_of_fame_tours, dtype=population.tours.dtype).reshape(len(hall_of_fame_tours), node_count),
+    }
+    fitness_cache = population.fitness_cache
+    if fitness_cache is not None:
+        #Keys are 8 byte digests, kept in LRU order so evictions after the resume match too
+        arrays["fitness_cache_keys"] = np.frombuffer(b"".join(fitness_cache.costs), dtype=np.uint8).reshape(len(fitness_cache.costs), 8)
+        arrays["fitness_cache_costs"] = np.array(list(fitness_cache.costs.values()), dtype=np.float64)
+        arrays["fitness_cache_stats"] = np.array([fitness_cache.hits, fitness_cache.misses])
+    #Written next to the target and moved over it, a run killed while saving keeps its previous checkpoint
+    temporary_path = path + "." + str(os.getpid()) + ".tmp"
+    with open(temporary_path, "wb") as file:
+        np.savez(file, **arrays)
+    os.replace(temporary_path, path)
+
+def load_checkpoint(path):
+    """Reads a checkpoint into a dict of arrays, with settings and rng_state decoded."""
+    with np.load(path, allow_pickle=False) as data:
+        checkpoint = {name: data[name] for name in data.files}
+    if int(checkpoint["version"]) != CHECKPOINT_VERSION:
+        raise ValueError("Unsupported checkpoint version: " + str(checkpoint["version"]))
+    checkpoint["generation"] = int(checkpoint["generation"])
+    checkpoint["settings"] = json.loads(str(checkpoint["settings"]))
+    checkpoint["environment"] = str(checkpoint["environment"])
+    checkpoint["rng_state"] = json.loads(str(checkpoint["rng_state"]))
+    checkpoint["cost_history"] = checkpoint["cost_history"].tolist()
+    return checkpoint
+
+def restore_population(population, checkpoint):
+    """Puts the state of a loaded checkpoint into a Population built with the checkpoint's settings."""
+    from travlingsalesperson import canonical_tour_keys, inverse_positions
+    if checkpoint["environment"] != population.environment.fingerprint():
+        raise ValueError("Checkpoint was written for a different environment")
+    state = checkpoint["rng_state"]
+    population.rng = np.random.Generator(getattr(np.random, state["bit_generator"])())
+    population.rng.bit_generator.state = state
+    population.tours = checkpoint["tours"].copy()
+    population.positions = inverse_positions(population.tours)
+    population.costs = checkpoint["costs"].copy()
+    population.evaluation_count = int(checkpoint["evaluation_count"])
+    hall_of_fame = population.hall_of_fame
+    hall_of_fame.size = int(checkpoint["hall_of_fame_size"])
+    hall_of_fame.entry_counter = int(checkpoint["hall_of_fame_entry_counter"])
+    hall_of_fame.heap = []
+    hall_of_fame.tours = {}
+    hall_of_fame_tours = checkpoint["hall_of_fame_tours"]
+    for cost, entry_counter, tour, key in zip(checkpoint["hall_of_fame_costs"].tolist(), checkpoint["hall_of_fame_counters"].tolist(), hall_of_fame_tours,
+            canonical_tour_keys(hall_of_fame_tours)):
+        hall_of_fame.heap.append((cost, entry_counter, key))
+        hall_of_fame.tours[key] = tour.copy()
+    fitness_cache = population.fitness_cache
+    if fitness_cache is not None and "fitness_cache_keys" in checkpoint:
+        fitness_cache.costs.clear()
+        for key, cost in zip(checkpoint["fitness_cache_keys"], checkpoint["fitness_cache_costs"].tolist()):
+            fitness_cache.costs[key.tobytes()] = cost
+        fitness_cache.hits, fitness_cache.misses = checkpoint["fitness_cache_stats"].tolist()
+    return population
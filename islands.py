@@ -0,0 +1,156 @@
+import multiprocessing
+import queue
+from multiprocessing import shared_memory
+import numpy as np
+
+from seeding import check_seeding
+from tours import TOUR_BACKINGS
+from travlingsalesperson import CROSSOVER_OPERATORS, MUTATION_KICKS, MUTATION_MOVES, SELECTION_METHODS, Candidate, Environment, Population
+
+"""Island model: several populations evolve in their own processes and
+every few generations send their best tours to their neighbours.
+All islands read the same distance matrix, either from shared memory or
+by mapping the same cached matrix file.
+"""
+
+#Seconds between checks that every island is still alive while waiting for migrants
+WORKER_POLL_INTERVAL = 1.0
+
+def migration_sources(island, island_count, topology):
+    """Islands that send their migrants to the given island."""
+    if topology == "ring":
+        return [(island - 1) % island_count]
+    if topology == "full":
+        return [source for source in range(island_count) if source != island]
+    raise ValueError("Unknown migration topology: " + str(topology))
+
+def check_settings(settings, environment):
+    """Raises ValueError for option names the islands would otherwise only fail on after they have started."""
+    if settings["crossover_operator"] not in CROSSOVER_OPERATORS:
+        raise ValueError("Unknown crossover operator: " + str(settings["crossover_operator"]))
+    if settings["selection"] not in SELECTION_METHODS:
+        raise ValueError("Unknown selection method: " + str(settings["selection"]))
+    mutation_operator = settings["mutation_operator"]
+    if mutation_operator not in MUTATION_MOVES and mutation_operator not in MUTATION_KICKS and mutation_operator != "scramble":
+        raise ValueError("Unknown mutation operator: " + str(mutation_operator))
+    if settings["local_search"] not in (None, "elites", "offspring"):
+        raise ValueError("Unknown local search target: " + str(settings["local_search"]))
+    if settings["tour_backing"] not in TOUR_BACKINGS:
+        raise ValueError("Unknown tour backing: " + str(settings["tour_backing"]))
+    if settings["seeding"]:
+        check_seeding(settings["seeding"], environment)
+
+def receive(outbox, workers):
+    """Next message of the islands, raises instead of waiting forever once one of them has died."""
+    while True:
+        try:
+            return outbox.get(timeout=WORKER_POLL_INTERVAL)
+        except queue.Empty:
+            for island, worker in enumerate(workers):
+                if worker.exitcode is not None and worker.exitcode != 0:
+                    raise RuntimeError("Island " + str(island) + " stopped with exit code " + str(worker.exitcode))
+
+def island_worker(island, positions, width, height, metric, matrix_source, settings, seed, outbox, inbox):
+    #The matrix is either a cached .npy file every island maps itself, or a shared memory block
+    shared_matrix = None
+    if matrix_source[0] == "file":
+        distance_matrix = np.asarray(np.load(matrix_source[1], mmap_mode="r"))
+    else:
+        kind, matrix_name, matrix_shape, matrix_dtype = matrix_source
+        shared_matrix = shared_memory.SharedMemory(name=matrix_name)
+        distance_matrix = np.ndarray(matrix_shape, dtype=matrix_dtype, buffer=shared_matrix.buf)
+    try:
+        environment = Environment(len(positions), width, height, positions, distance_matrix, metric)
+        population = Population(settings["population_size"], environment, settings["crossover_operator"], settings["local_search"],
+            selection = settings["selection"], tournament_size = settings["tournament_size"],
+            fitness_cache_size = settings["fitness_cache_size"], rng = np.random.default_rng(seed), lk_depth = settings["lk_depth"],
+            tour_backing = settings["tour_backing"], seeding = settings["seeding"])
+        generations = settings["generations"]
+        migration_interval = settings["migration_interval"]
+        epochs = max(1, -(-generations // migration_interval))
+        for epoch in range(epochs):
+            for iteration_counter in range(min(migration_interval, generations - epoch * migration_interval)):
+                population.next_generation(settings["mutation_rate"], settings["mutation_operator"])
+            best_candidates = population.select_fittest(settings["migrant_count"])
+            outbox.put((island, population.tours[best_candidates].copy(), population.costs[best_candidates].copy()))
+            if epoch < epochs - 1:
+                population.replace_worst(inbox.get())
+        del distance_matrix, environment, population
+    finally:
+        if shared_matrix is not None:
+            shared_matrix.close()
+
+def solve_islands(environment, island_count, generations, population_size, mutation_rate, migration_interval = 25,
+        topology = "ring", migrant_count = 1, seed = None, crossover_operator = "order", mutation_operator = "swap", local_search = None,
+        selection = "tournament", tournament_size = 2, fitness_cache_size = 0, lk_depth = 0, tour_backing = "array", seeding = None):
+    """Runs one Population per process and migrates the best tours between them.
+
+    Every island gets its own random stream spawned from seed (an int or np.random.SeedSequence).
+    Returns the best candidate over all islands and the lowest cost seen at every migration.
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    island_seeds = seed.spawn(island_count)
+    settings = {
+        "generations": generations,
+        "population_size": population_size,
+        "mutation_rate": mutation_rate,
+        "migration_interval": max(1, migration_interval),
+        "migrant_count": migrant_count,
+        "crossover_operator": crossover_operator,
+        "mutation_operator": mutation_operator,
+        "local_search": local_search,
+        "selection": selection,
+        "tournament_size": tournament_size,
+        "fitness_cache_size": fitness_cache_size,
+        "lk_depth": lk_depth,
+        "tour_backing": tour_backing,
+        "seeding": seeding,
+    }
+    check_settings(settings, environment)
+    for island in range(island_count):
+        migration_sources(island, island_count, topology)
+    distance_matrix = environment.distance_matrix
+    shared_matrix = None
+    if environment.matrix_path is not None:
+        matrix_source = ("file", environment.matrix_path)
+    else:
+        shared_matrix = shared_memory.SharedMemory(create=True, size=max(1, distance_matrix.nbytes))
+        np.ndarray(distance_matrix.shape, dtype=distance_matrix.dtype, buffer=shared_matrix.buf)[:] = distance_matrix
+        matrix_source = ("shared", shared_matrix.name, distance_matrix.shape, distance_matrix.dtype.str)
+    workers = []
+    try:
+        positions = environment.positions
+        outbox = multiprocessing.Queue()
+        inboxes = [multiprocessing.Queue() for island in range(island_count)]
+        for island in range(island_count):
+            worker = multiprocessing.Process(target=island_worker, args=(island, positions, environment.width, environment.height, environment.metric,
+                matrix_source, settings, island_seeds[island], outbox, inboxes[island]))
+            worker.start()
+            workers.append(worker)
+
+        epochs = max(1, -(-generations // settings["migration_interval"]))
+        cost_history = []
+        best_tour, best_cost = None, float("inf")
+        for epoch in range(epochs):
+            migrants = {}
+            for message in range(island_count):
+                island, tours, costs = receive(outbox, workers)
+                migrants[island] = tours
+                if costs[0] < best_cost:
+                    best_tour, best_cost = tours[0], float(costs[0])
+            cost_history.append(best_cost)
+            if epoch < epochs - 1:
+                for island in range(island_count):
+                    sources = migration_sources(island, island_count, topology)
+                    inboxes[island].put(np.concatenate([migrants[source] for source in sources]))
+        for worker in workers:
+            worker.join()
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        if shared_matrix is not None:
+            shared_matrix.close()
+            shared_matrix.unlink()
+    return Candidate(environment, best_tour, cost = best_cost), cost_history
@@ -0,0 +1,301 @@
+from collections import deque
+import numpy as np
+
+from tours import tour_backing
+
+"""Local search improvers that work on a tour array of node IDs in place.
+Moves are only tried towards the k nearest neighbours of a node, and nodes
+whose neighbourhood gave no improvement are skipped (don't-look bits) until
+one of their tour edges changes.
+
+The search runs on a tour object from tours.py, an array or a two level
+list, through its next, prev, between and flip operations only. Every move
+is a few flips, prices itself from the edges it replaces and can be rolled
+back through the tour's journal, so the same moves also serve as random
+kicks for the genetic algorithm's mutation and for iterated_local_search.
+"""
+
+IMPROVEMENT_EPSILON = 1e-9
+
+def exchange(tour, a, b, c, d):
+    """Replaces the edges (a, b) and (c, d) by (a, c) and (b, d), b follows a and d follows c in the same direction."""
+    if b == c or a == d:
+        return
+    if tour.next(a) == b:
+        tour.flip(a, b, c, d)
+    else:
+        tour.flip(d, c, b, a)
+
+def rollback(tour, length):
+    """Undoes the flips recorded in the tour's journal after its first length entries."""
+    journal = tour.journal
+    #The undoing flips go to a scratch journal so they are not undone in turn
+    tour.journal = []
+    while len(journal) > length:
+        a, b, c, d = journal.pop()
+        exchange(tour, a, c, b, d)
+    tour.journal = journal
+
+def insert_segment(tour, first, last, left, right, reverse = False):
+    """3-opt segment insertion: moves the path first..last between the adjacent nodes left and right.
+
+    The segment runs forwards from first to last and right follows left in
+    the same direction, outside the segment. Done as two flips, plus a third
+    to turn the segment back round when reverse is False.
+    """
+    before, after = tour.prev(first), tour.next(last)
+    exchange(tour, before, first, left, right)
+    exchange(tour, before, left, after, last)
+    if not reverse:
+        exchange(tour, left, last, first, right)
+
+def segment_insertion_delta(distance_matrix, before, first, last, after, left, right, reverse = False):
+    """Change in tour length of insert_segment."""
+    delta = distance_matrix[before, after] - distance_matrix[left, right] - distance_matrix[before, first] - distance_matrix[last, after]
+    if reverse:
+        return delta + distance_matrix[left, last] + distance_matrix[first, right]
+    return delta + distance_matrix[left, first] + distance_matrix[last, right]
+
+def walk(tour, node, steps):
+    for step in range(steps):
+        node = tour.next(node)
+    return node
+
+def or_opt_kick(distance_matrix, tour, rng, max_segment_length = 3):
+    """Relocates a random segment of 1 to max_segment_length nodes to a random edge, in a random orientation.
+
+    Returns the change in tour length and the nodes whose tour edges changed.
+    """
+    node_count = len(tour)
+    if node_count < 5:
+        return 0.0, ()
+    first, extra_length, reverse, left = rng.integers(0, [node_count, min(max_segment_length, node_count - 3), 2, node_count]).tolist()
+    last = walk(tour, first, extra_length)
+    before, after = tour.prev(first), tour.next(last)
+    #Any edge outside the segment except the one it already sits in
+    while left == before or tour.between(first, left, last):
+        left = int(rng.integers(node_count))
+    right = tour.next(left)
+    delta = segment_insertion_delta(distance_matrix, before, first, last, after, left, right, bool(reverse))
+    insert_segment(tour, first, last, left, right, bool(reverse))
+    return float(delta), (before, first, last, after, left, right)
+
+def double_bridge_kick(distance_matrix, tour, rng, max_segment_length = None):
+    """Swaps two adjacent random segments of at most max_segment_length nodes each (a third of the tour by default).
+
+    A B C D becomes A C B D, the classic kick that 2-opt and Or-opt cannot
+    undo in a single move. It is a segment insertion of B after C. Returns
+    the change in tour length and the nodes whose tour edges changed.
+    """
+    node_count = len(tour)
+    if node_count < 8:
+        return 0.0, ()
+    longest = node_count // 3 if max_segment_length is None else max(1, min(max_segment_length, node_count // 3))
+    first, first_extra, second_extra = rng.integers(0, [node_count, longest, longest]).tolist()
+    last = walk(tour, first, first_extra)
+    second_first = tour.next(last)
+    second_last = walk(tour, second_first, second_extra)
+    before, after = tour.prev(first), tour.next(second_last)
+    delta = segment_insertion_delta(distance_matrix, before, first, last, second_first, second_last, after)
+    insert_segment(tour, first, last, second_last, after)
+    return float(delta), (before, first, last, second_first, second_last, after)
+
+KICKS = {"or_opt": or_opt_kick, "double_bridge": double_bridge_kick}
+
+def try_two_opt(distance_matrix, tour, neighbours, node):
+    successor = tour.next(node)
+    predecessor = tour.prev(node)
+    for other in neighbours[node]:
+        #Successor direction: (node, successor) and (other, its successor) become (node, other) and (successor, other successor)
+        if distance_matrix[node, other] < distance_matrix[node, successor]:
+            other_successor = tour.next(other)
+            if other != successor and other_successor != node:
+                gain = (distance_matrix[node, successor] + distance_matrix[other, other_successor]
+                    - distance_matrix[node, other] - distance_matrix[successor, other_successor])
+                if gain > IMPROVEMENT_EPSILON:
+                    tour.flip(node, successor, other, other_successor)
+                    return float(gain), (node, successor, other, other_successor)
+        #Predecessor direction: (predecessor, node) and (other predecessor, other) become (node, other) and (predecessor, other predecessor)
+        if distance_matrix[node, other] < distance_matrix[predecessor, node]:
+            other_predecessor = tour.prev(other)
+            if other != predecessor and other_predecessor != node:
+                gain = (distance_matrix[predecessor, node] + distance_matrix[other_predecessor, other]
+                    - distance_matrix[node, other] - distance_matrix[predecessor, other_predecessor])
+                if gain > IMPROVEMENT_EPSILON:
+                    tour.flip(other_predecessor, other, predecessor, node)
+                    return float(gain), (node, predecessor, other, other_predecessor)
+    return 0.0, ()
+
+def try_or_opt(distance_matrix, tour, neighbours, node, max_segment_length = 3):
+    node_count = len(tour)
+    first = last = node
+    before = tour.prev(first)
+    for length in range(1, min(max_segment_length, node_count - 3) + 1):
+        if length > 1:
+            last = tour.next(last)
+        after = tour.next(last)
+        removal_gain = distance_matrix[before, first] + distance_matrix[last, after] - distance_matrix[before, after]
+        for other in neighbours[node]:
+            if tour.between(first, other, last):
+                continue
+            #Either edge touching the neighbour can take the segment, in either orientation
+            for left, right in ((other, tour.next(other)), (tour.prev(other), other)):
+                if left == last or right == first:
+                    continue
+                forward = distance_matrix[left, first] + distance_matrix[last, right]
+                backward = distance_matrix[left, last] + distance_matrix[first, right]
+                gain = removal_gain + distance_matrix[left, right] - min(forward, backward)
+                if gain > IMPROVEMENT_EPSILON:
+                    insert_segment(tour, first, last, left, right, backward < forward)
+                    return float(gain), (before, after, left, right, first, last)
+    return 0.0, ()
+
+def try_lin_kernighan(distance_matrix, tour, neighbours, node, max_depth = 50):
+    """Variable depth search from node: a chain of up to max_depth sequential 2-opt moves, each one breaking the edge the previous one closed.
+
+    This is the Lin-Kernighan step with 2-opt as its basic move. The chain
+    keeps t1 = node fixed. Each step removes the edge (t1, t2), adds
+    (t2, t3) towards a neighbour of t2, and removes (t4, t3), so that
+    closing with (t4, t1) gives a valid tour. A step is only taken while the
+    gain without the closing edge stays positive, and an edge added by the
+    chain is never removed again. The chain is rolled back to its best
+    closed tour, and nothing changes if no prefix of the chain improved.
+    """
+    for successor_first in (True, False):
+        t1 = node
+        t2 = tour.next(t1) if successor_first else tour.prev(t1)
+        closed_gain, best_gain, best_depth = 0.0, 0.0, 0
+        start = len(tour.journal)
+        added = set()
+        touched = [t2]
+        for depth in range(max_depth):
+            #The flips may have turned round which side of t1 the edge (t1, t2) is on
+            forward = tour.next(t1) == t2
+            #Summed as Python floats, a float32 matrix would otherwise round the chain's running gain at every step
+            open_gain = closed_gain + float(distance_matrix[t1, t2])
+            best_choice, best_value = None, float("-inf")
+            for t3 in neighbours[t2]:
+                partial_gain = open_gain - distance_matrix[t2, t3]
+                if partial_gain <= IMPROVEMENT_EPSILON:
+                    #Neighbours come nearest first, none of the remaining ones can do better
+                    break
+                if t3 == t1:
+                    continue
+                t4 = tour.prev(t3) if forward else tour.next(t3)
+                if t4 == t2 or (min(t3, t4), max(t3, t4)) in added:
+                    continue
+                value = distance_matrix[t4, t3] - distance_matrix[t2, t3]
+                if value > best_value:
+                    best_choice, best_value = (t3, t4), value
+            if best_choice is None:
+                break
+            t3, t4 = best_choice
+            if forward:
+                tour.flip(t1, t2, t4, t3)
+            else:
+                tour.flip(t2, t1, t3, t4)
+            added.add((min(t2, t3), max(t2, t3)))
+            closed_gain = open_gain - float(distance_matrix[t2, t3]) + float(distance_matrix[t4, t3]) - float(distance_matrix[t4, t1])
+            touched.extend((t3, t4))
+            if closed_gain > best_gain + IMPROVEMENT_EPSILON:
+                best_gain, best_depth = closed_gain, depth + 1
+            t2 = t4
+        rollback(tour, start + best_depth)
+        if best_depth:
+            return best_gain, tuple(touched[:2 * best_depth + 1])
+    return 0.0, ()
+
+def search(distance_matrix, tour, neighbours, nodes, or_opt = True, lk_depth = 0):
+    """Neighbour list search on a tour object, starting with the given nodes as the only active ones.
+
+    Tries 2-opt from every active node, or a Lin-Kernighan chain of up to
+    lk_depth moves when lk_depth is set, and Or-opt when neither improves.
+    """
+    active = [False] * len(tour)
+    queue = deque()
+    for node in nodes:
+        if not active[node]:
+            active[node] = True
+            queue.append(node)
+    delta = 0.0
+    while queue:
+        node = queue.popleft()
+        active[node] = False
+        if lk_depth > 0:
+            gain, touched = try_lin_kernighan(distance_matrix, tour, neighbours, node, lk_depth)
+        else:
+            gain, touched = try_two_opt(distance_matrix, tour, neighbours, node)
+        if gain == 0.0 and or_opt:
+            gain, touched = try_or_opt(distance_matrix, tour, neighbours, node)
+        if gain > 0.0:
+            delta -= gain
+            for touched_node in (node,) + touched:
+                if not active[touched_node]:
+                    active[touched_node] = True
+                    queue.append(touched_node)
+    return delta
+
+def store_tour(tour, order, positions = None):
+    tour[:] = order
+    if positions is not None:
+        positions[tour] = np.arange(len(tour))
+
+def improve_tour(distance_matrix, tour, neighbours, positions = None, or_opt = True, lk_depth = 0, backing = "array"):
+    """2-opt (and Or-opt) local search on a tour array until no neighbour move improves it.
+
+    With lk_depth set, Lin-Kernighan chains of up to lk_depth moves take the
+    place of single 2-opt moves. backing names the tours.py representation
+    the search runs on. Updates tour (and positions, if given) in place and
+    returns the change in tour length, which is never positive.
+    """
+    if len(tour) < 5:
+        return 0.0
+    tour_list = tour.tolist()
+    tour_object = tour_backing(backing, tour_list)
+    delta = search(distance_matrix, tour_object, neighbours.tolist(), tour_list, or_opt, lk_depth)
+    if delta:
+        store_tour(tour, tour_object.order(), positions)
+    return float(delta)
+
+def iterated_local_search(distance_matrix, tour, neighbours, kicks, rng, positions = None, or_opt = True, kick_segment_length = 50, lk_depth = 0, backing = "array"):
+    """improve_tour followed by kicks rounds of a local double bridge and a new search around it.
+
+    A round is kept when the tour got no longer, otherwise its flips are
+    rolled back. The segments of the double bridge are at most
+    kick_segment_length nodes long, so each search only has to repair the
+    neighbourhood of the kick. With lk_depth set this is chained
+    Lin-Kernighan. Returns the change in tour length.
+    """
+    if len(tour) < 8:
+        return improve_tour(distance_matrix, tour, neighbours, positions, or_opt, lk_depth, backing)
+    tour_list = tour.tolist()
+    tour_object = tour_backing(backing, tour_list)
+    neighbour_list = neighbours.tolist()
+    delta = search(distance_matrix, tour_object, neighbour_list, tour_list, or_opt, lk_depth)
+    for kick in range(kicks):
+        del tour_object.journal[:]
+        kick_delta, touched = double_bridge_kick(distance_matrix, tour_object, rng, kick_segment_length)
+        kick_delta += search(distance_matrix, tour_object, neighbour_list, touched, or_opt, lk_depth)
+        if kick_delta < IMPROVEMENT_EPSILON:
+            delta += kick_delta
+        else:
+            rollback(tour_object, 0)
+    store_tour(tour, tour_object.order(), positions)
+    return float(delta)
+
+def improve_candidate(candidate, neighbour_count = 8, or_opt = True, kicks = 0, rng = None, lk_depth = 0, backing = "array"):
+    """Runs improve_tour on a Candidate and updates its solution and cost.
+
+    With kicks above zero it runs iterated_local_search with that many double
+    bridge kicks instead, drawn from the Generator (or seed) rng. Passing
+    lk_depth as well makes it chained Lin-Kernighan.
+    """
+    environment = candidate.environment
+    neighbours = environment.neighbour_lists(neighbour_count)
+    if kicks > 0:
+        delta = iterated_local_search(environment.distance_matrix, candidate.solution, neighbours, kicks, np.random.default_rng(rng), or_opt = or_opt,
+            lk_depth = lk_depth, backing = backing)
+    else:
+        delta = improve_tour(environment.distance_matrix, candidate.solution, neighbours, or_opt = or_opt, lk_depth = lk_depth, backing = backing)
+    candidate.cost += delta
+    return candidate
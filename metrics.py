@@ -0,0 +1,92 @@
+import csv
+import json
+import time
+
+"""Per-generation statistics of a run and the sinks they are written to.
+A sink only needs emit(record) and close(), records are flat dicts.
+"""
+
+PHASES = ("selection", "breeding", "evaluation", "mutation", "local_search", "drawing")
+
+class MemorySink:
+    def __init__(self):
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def close(self):
+        pass
+
+class CsvSink:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.writer = None
+
+    def emit(self, record):
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.file, fieldnames=list(record))
+            self.writer.writeheader()
+        self.writer.writerow(record)
+
+    def close(self):
+        self.file.close()
+
+class JsonLinesSink:
+    def __init__(self, path):
+        self.file = open(path, "w")
+
+    def emit(self, record):
+        self.file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self.file.close()
+
+def sink_for_path(path):
+    return CsvSink(path) if path.lower().endswith(".csv") else JsonLinesSink(path)
+
+def diversity(tours):
+    """Share of the population's tours that are distinct cycles, 1.0 means no duplicates."""
+    from travlingsalesperson import canonical_tour_keys
+    if len(tours) == 0:
+        return 0.0
+    return len(set(canonical_tour_keys(tours))) / len(tours)
+
+class MetricsRecorder:
+    """Collects phase times from a Population and emits one record every interval generations."""
+    def __init__(self, sink, interval = 1, population = None):
+        self.sink = sink
+        self.interval = max(1, interval)
+        self.last_time = time.perf_counter()
+        #Counted from the population's current totals, its initial (or restored) generation is not part of the first interval
+        self.last_evaluations = population.evaluation_count if population is not None else 0
+        self.last_phase_times = dict(population.phase_times) if population is not None else dict.fromkeys(PHASES, 0.0)
+
+    def record(self, generation, population):
+        if generation % self.interval:
+            return
+        now = time.perf_counter()
+        elapsed = now - self.last_time
+        costs = population.costs
+        record = {
+            "generation": generation,
+            "best": float(costs.min()),
+            "mean": float(costs.mean()),
+            "worst": float(costs.max()),
+            "diversity": diversity(population.tours),
+            "evaluations_per_second": (population.evaluation_count - self.last_evaluations) / elapsed if elapsed > 0 else 0.0,
+        }
+        for phase in PHASES:
+            total = population.phase_times[phase]
+            record[phase + "_seconds"] = total - self.last_phase_times[phase]
+            self.last_phase_times[phase] = total
+        if population.fitness_cache is not None:
+            #Running totals, the cache lives for the whole run
+            record["fitness_cache_hits"] = population.fitness_cache.hits
+            record["fitness_cache_misses"] = population.fitness_cache.misses
+        self.last_time = now
+        self.last_evaluations = population.evaluation_count
+        self.sink.emit(record)
+
+    def close(self):
+        self.sink.close()
@@ -0,0 +1,263 @@
+import numpy as np
+
+from local_search import double_bridge_kick
+from spatial_index import NodePool
+from tours import ArrayTour
+
+"""Starting tours for the first generation. Besides random permutations a
+share of the population can come from construction heuristics: nearest
+neighbour from random starts, greedy edge matching, Hilbert curve order and
+a Christofides-like tour from a minimum spanning tree. Candidate edges come
+from the environment's neighbour lists and nearest queries over the nodes
+still free go through the spatial index, so no heuristic looks at all
+pairs of nodes.
+"""
+
+CANDIDATE_NEIGHBOURS = 10
+#Double bridge kicks that turn the one tour of a deterministic heuristic into distinct population members
+PERTURBATION_KICKS = 3
+PERTURBATION_SEGMENT_LENGTH = 50
+
+class Pool:
+    """Nodes not used yet, with nearest queries through the grid or, for GEO and EXPLICIT instances, the distance matrix."""
+    def __init__(self, environment, nodes = None):
+        self.environment = environment
+        if environment.metric in environment.PLANAR_METRICS:
+            self.grid = NodePool(environment.spatial_index, nodes)
+            self.available = self.grid.available
+        else:
+            self.grid = None
+            self.available = np.zeros(environment.node_count, dtype=bool)
+            self.available[np.arange(environment.node_count) if nodes is None else nodes] = True
+        self.count = int(self.available.sum())
+
+    def __len__(self):
+        return self.count
+
+    def take(self, node):
+        if self.available[node]:
+            self.count -= 1
+            if self.grid is not None:
+                self.grid.take(node)
+            else:
+                self.available[node] = False
+
+    def first(self):
+        return int(np.argmax(self.available))
+
+    def nearest(self, node):
+        if self.grid is not None:
+            return self.grid.nearest(self.environment.positions[node])
+        distances = np.where(self.available, self.environment.distance_matrix[node], np.inf)
+        return int(np.argmin(distances))
+
+def candidate_edges(environment, neighbours):
+    """Every neighbour list edge once, as (a, b) pairs sorted by length."""
+    node_count = environment.node_count
+    pairs = np.column_stack((np.repeat(np.arange(node_count), len(neighbours[0])), np.asarray(neighbours).ravel()))
+    pairs = np.unique(np.sort(pairs, axis=1), axis=0)
+    lengths = environment.distance_matrix[pairs[:, 0], pairs[:, 1]]
+    return pairs[np.argsort(lengths, kind="stable")].tolist()
+
+def find(parents, node):
+    root = node
+    while parents[root] != root:
+        root = parents[root]
+    while parents[node] != root:
+        parents[node], node = root, parents[node]
+    return root
+
+def nearest_neighbour_tour(environment, neighbours, rng):
+    """Always moves on to the closest node not visited yet, starting from a random node."""
+    pool = Pool(environment)
+    available = pool.available
+    node = int(rng.integers(environment.node_count))
+    tour = [node]
+    pool.take(node)
+    while len(pool):
+        next_node = None
+        for other in neighbours[node]:
+            if available[other]:
+                next_node = other
+                break
+        if next_node is None:
+            next_node = pool.nearest(node)
+        pool.take(next_node)
+        tour.append(next_node)
+        node = next_node
+    return tour
+
+def join_fragments(environment, adjacency, rng):
+    """Links paths (adjacency lists of nodes with at most two neighbours, no cycles) into one tour, always to the nearest free path end."""
+    node_count = environment.node_count
+    other_end = [-1] * node_count
+    for node in range(node_count):
+        if len(adjacency[node]) < 2 and other_end[node] < 0:
+            previous, current = node, node
+            if adjacency[node]:
+                current = adjacency[node][0]
+                while len(adjacency[current]) == 2:
+                    following = adjacency[current][0] if adjacency[current][0] != previous else adjacency[current][1]
+                    previous, current = current, following
+            other_end[node], other_end[current] = current, node
+    ends = [node for node in range(node_count) if other_end[node] >= 0]
+    pool = Pool(environment, ends)
+    tour = []
+    end = ends[int(rng.integers(len(ends)))]
+    while end is not None:
+        pool.take(end)
+        pool.take(other_end[end])
+        previous, current = -1, end
+        while True:
+            tour.append(current)
+            if current == other_end[end]:
+                break
+            following = adjacency[current][0] if adjacency[current][0] != previous else adjacency[current][1]
+            previous, current = current, following
+        end = pool.nearest(current) if len(pool) else None
+    return tour
+
+def greedy_edge_tour(environment, neighbours, rng):
+    """Adds the shortest candidate edges that keep every node at degree two or less and close no cycle, then joins the paths."""
+    node_count = environment.node_count
+    parents = list(range(node_count))
+    adjacency = [[] for node in range(node_count)]
+    for a, b in candidate_edges(environment, neighbours):
+        if len(adjacency[a]) < 2 and len(adjacency[b]) < 2:
+            root_a, root_b = find(parents, a), find(parents, b)
+            if root_a != root_b:
+                parents[root_a] = root_b
+                adjacency[a].append(b)
+                adjacency[b].append(a)
+    return join_fragments(environment, adjacency, rng)
+
+def hilbert_tour(environment, neighbours, rng):
+    """Nodes in the order a Hilbert curve over the plane passes them."""
+    return environment.hilbert_order().tolist()
+
+def christofides_tour(environment, neighbours, rng):
+    """Christofides without the exact matching: minimum spanning tree of the candidate edges, greedy matching of its
+    odd degree nodes, then an Euler circuit with repeated nodes skipped. The circuit starts at a random node and
+    takes the edges in a random order, so every call gives a different tour."""
+    node_count = environment.node_count
+    parents = list(range(node_count))
+    edges = []
+    degree = [0] * node_count
+    candidates = candidate_edges(environment, neighbours)
+    for a, b in candidates:
+        root_a, root_b = find(parents, a), find(parents, b)
+        if root_a != root_b:
+            parents[root_a] = root_b
+            edges.append((a, b))
+    #Neighbour lists can leave clusters disconnected, their trees are chained through nearest representatives
+    roots = sorted({find(parents, node) for node in range(node_count)})
+    if len(roots) > 1:
+        pool = Pool(environment, roots)
+        node = roots[0]
+        pool.take(node)
+        while len(pool):
+            other = pool.nearest(node)
+            pool.take(other)
+            edges.append((node, other))
+            node = other
+    for a, b in edges:
+        degree[a] += 1
+        degree[b] += 1
+    odd = [degree[node] % 2 == 1 for node in range(node_count)]
+    for a, b in candidates:
+        if odd[a] and odd[b]:
+            odd[a] = odd[b] = False
+            edges.append((a, b))
+    unmatched = [node for node in range(node_count) if odd[node]]
+    pool = Pool(environment, unmatched)
+    while len(pool):
+        a = pool.first()
+        pool.take(a)
+        b = pool.nearest(a)
+        pool.take(b)
+        edges.append((a, b))
+    adjacency = [[] for node in range(node_count)]
+    for edge in rng.permutation(len(edges)).tolist():
+        a, b = edges[edge]
+        adjacency[a].append((b, edge))
+        adjacency[b].append((a, edge))
+    used = [False] * len(edges)
+    pointers = [0] * node_count
+    stack = [int(rng.integers(node_count))]
+    visited = [False] * node_count
+    tour = []
+    while stack:
+        node = stack[-1]
+        edge_list = adjacency[node]
+        while pointers[node] < len(edge_list) and used[edge_list[pointers[node]][1]]:
+            pointers[node] += 1
+        if pointers[node] < len(edge_list):
+            other, edge = edge_list[pointers[node]]
+            used[edge] = True
+            stack.append(other)
+        else:
+            stack.pop()
+            if not visited[node]:
+                visited[node] = True
+                tour.append(node)
+    return tour
+
+SEEDING_STRATEGIES = {
+    "nearest_neighbour": nearest_neighbour_tour,
+    "greedy": greedy_edge_tour,
+    "hilbert": hilbert_tour,
+    "christofides": christofides_tour,
+}
+#Strategies that always build the same tour, their further copies are perturbed
+DETERMINISTIC_STRATEGIES = ("greedy", "hilbert")
+
+def perturb(environment, tour, rng):
+    tour = ArrayTour(tour)
+    for kick in range(PERTURBATION_KICKS):
+        double_bridge_kick(environment.distance_matrix, tour, rng, PERTURBATION_SEGMENT_LENGTH)
+    return tour.tour
+
+def parse_seeding(text):
+    """Parses "name:share,name:share", e.g. "nearest_neighbour:0.2,greedy:0.05", into a seeding dict."""
+    seeding = {}
+    for part in text.split(","):
+        name, separator, share = part.partition(":")
+        name = name.strip()
+        seeding[name] = float(share) if separator else 1.0
+    check_seeding(seeding)
+    return seeding
+
+def check_seeding(seeding, environment = None):
+    """Raises ValueError for unknown strategies, bad shares and, given the environment, strategies its metric cannot use."""
+    if any(name not in SEEDING_STRATEGIES for name in seeding):
+        raise ValueError("Unknown seeding strategy in " + str(sorted(seeding)))
+    if sum(seeding.values()) > 1.0 + 1e-9 or min(seeding.values()) < 0:
+        raise ValueError("Seeding shares must be non-negative and add up to at most 1")
+    if environment is not None and "hilbert" in seeding and not environment.has_coordinates:
+        raise ValueError("hilbert seeding needs node coordinates, " + str(environment.metric) + " instances only have distances")
+
+def seed_tours(environment, count, seeding, rng):
+    """The count tours of a first generation as a (count, node_count) array.
+
+    seeding maps strategy names to the share of the population built with
+    them, the rest are random permutations. None or an empty dict gives a
+    fully random generation.
+    """
+    node_count = environment.node_count
+    tours = np.empty((count, node_count), dtype=np.int32)
+    filled = 0
+    if seeding and node_count > 3:
+        check_seeding(seeding, environment)
+        neighbours = environment.neighbour_lists(CANDIDATE_NEIGHBOURS).tolist()
+        for name, share in seeding.items():
+            strategy = SEEDING_STRATEGIES[name]
+            base = None
+            for copy in range(min(int(round(share * count)), count - filled)):
+                if name in DETERMINISTIC_STRATEGIES and base is not None:
+                    tours[filled] = perturb(environment, base, rng)
+                else:
+                    base = strategy(environment, neighbours, rng)
+                    tours[filled] = base
+                filled += 1
+    tours[filled:] = rng.permuted(np.tile(np.arange(node_count, dtype=np.int32), (count - filled, 1)), axis=1)
+    return tours
@@ -0,0 +1,176 @@
+import numpy as np
+
+"""Uniform grid over node positions for nearest-neighbour and radius queries.
+Nodes are bucketed into square cells holding a couple of nodes each, so a
+query only looks at the cells around the query point instead of every node.
+"""
+
+def hilbert_keys(positions, bits = 16):
+    """Position of every point along a Hilbert curve over the bounding square of the points, points close on the curve are close in the plane."""
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+    keys = np.zeros(len(positions), dtype=np.int64)
+    if not len(positions):
+        return keys
+    side = 1 << bits
+    origin = positions.min(axis=0)
+    extent = max(float((positions.max(axis=0) - origin).max()), 1e-12)
+    scaled = np.floor((positions - origin) / extent * (side - 1)).astype(np.int64)
+    x, y = scaled[:, 0].copy(), scaled[:, 1].copy()
+    step = side >> 1
+    while step > 0:
+        rx = (x & step) > 0
+        ry = (y & step) > 0
+        keys += step * step * ((3 * rx.astype(np.int64)) ^ ry.astype(np.int64))
+        #Rotate the quadrant so the curve inside it starts and ends at the right corners
+        rotate = ~ry
+        mirror = rotate & rx
+        x[mirror] = side - 1 - x[mirror]
+        y[mirror] = side - 1 - y[mirror]
+        x[rotate], y[rotate] = y[rotate], x[rotate]
+        step >>= 1
+    return keys
+
+class GridIndex:
+    def __init__(self, positions, nodes_per_cell = 2):
+        self.positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        node_count = len(self.positions)
+        if node_count:
+            self.origin = self.positions.min(axis=0)
+            extent = self.positions.max(axis=0) - self.origin
+        else:
+            self.origin = np.zeros(2)
+            extent = np.zeros(2)
+        area = max(extent[0], 1.0) * max(extent[1], 1.0)
+        self.cell_size = max((area * nodes_per_cell / max(node_count, 1)) ** 0.5, 1e-9)
+        self.columns, self.rows = (np.floor(extent / self.cell_size).astype(np.intp) + 1).tolist()
+        cells = self.cell_of(self.positions)
+        self.cell_ids = cells[:, 1] * self.columns + cells[:, 0]
+        #Node IDs sorted by cell, the nodes of cell c are order[cell_start[c]:cell_start[c + 1]]
+        self.order = np.argsort(self.cell_ids, kind="stable")
+        self.cell_start = np.zeros(self.columns * self.rows + 1, dtype=np.intp)
+        np.cumsum(np.bincount(self.cell_ids, minlength=self.columns * self.rows), out=self.cell_start[1:])
+
+    def cell_of(self, points):
+        cells = np.floor((np.asarray(points, dtype=np.float64) - self.origin) / self.cell_size).astype(np.intp)
+        return np.clip(cells, 0, [self.columns - 1, self.rows - 1])
+
+    def nodes_in_cells(self, column_low, column_high, row_low, row_high):
+        column_low, row_low = max(column_low, 0), max(row_low, 0)
+        column_high, row_high = min(column_high, self.columns - 1), min(row_high, self.rows - 1)
+        if column_low > column_high or row_low > row_high:
+            return np.empty(0, dtype=np.intp)
+        slices = []
+        for row in range(row_low, row_high + 1):
+            first = self.cell_start[row * self.columns + column_low]
+            last = self.cell_start[row * self.columns + column_high + 1]
+            slices.append(self.order[first:last])
+        return np.concatenate(slices)
+
+    def ring_cells(self, column, row, radius):
+        """IDs of the cells at exactly Chebyshev distance radius from the given cell that lie inside the grid."""
+        if radius == 0:
+            columns, rows = np.array([column]), np.array([row])
+        else:
+            span = np.arange(-radius, radius + 1)
+            inner = np.arange(-radius + 1, radius)
+            columns = np.concatenate((column + span, column + span, np.full(len(inner), column - radius), np.full(len(inner), column + radius)))
+            rows = np.concatenate((np.full(len(span), row - radius), np.full(len(span), row + radius), row + inner, row + inner))
+        inside = (columns >= 0) & (columns < self.columns) & (rows >= 0) & (rows < self.rows)
+        return rows[inside] * self.columns + columns[inside]
+
+    def ring(self, column, row, radius):
+        """Nodes in the cells at exactly Chebyshev distance radius from the given cell."""
+        if radius == 0:
+            return self.nodes_in_cells(column, column, row, row)
+        parts = [
+            self.nodes_in_cells(column - radius, column + radius, row - radius, row - radius),
+            self.nodes_in_cells(column - radius, column + radius, row + radius, row + radius),
+            self.nodes_in_cells(column - radius, column - radius, row - radius + 1, row + radius - 1),
+            self.nodes_in_cells(column + radius, column + radius, row - radius + 1, row + radius - 1),
+        ]
+        return np.concatenate(parts)
+
+    def k_nearest(self, point, k, exclude = None):
+        """IDs of the k nodes closest to point, nearest first, leaving out the node ID exclude."""
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        point = np.asarray(point, dtype=np.float64)
+        column, row = self.cell_of(point).tolist()
+        max_radius = max(self.columns, self.rows)
+        found = []
+        found_count = 0
+        for radius in range(max_radius + 1):
+            nodes = self.ring(column, row, radius)
+            if exclude is not None:
+                nodes = nodes[nodes != exclude]
+            found.append(nodes)
+            found_count += len(nodes)
+            #Every node outside the rings searched so far is at least radius cells away
+            if found_count >= k:
+                candidates = np.concatenate(found)
+                distances = np.hypot(*(self.positions[candidates] - point).T)
+                if np.partition(distances, k - 1)[k - 1] <= radius * self.cell_size:
+                    break
+        candidates = np.concatenate(found) if found else np.empty(0, dtype=np.intp)
+        distances = np.hypot(*(self.positions[candidates] - point).T)
+        nearest = np.argsort(distances, kind="stable")[:k]
+        return candidates[nearest]
+
+    def within_radius(self, point, radius, exclude = None):
+        """IDs of every node no further than radius from point."""
+        point = np.asarray(point, dtype=np.float64)
+        column_low, row_low = np.floor((point - radius - self.origin) / self.cell_size).astype(np.intp).tolist()
+        column_high, row_high = np.floor((point + radius - self.origin) / self.cell_size).astype(np.intp).tolist()
+        candidates = self.nodes_in_cells(column_low, column_high, row_low, row_high)
+        if exclude is not None:
+            candidates = candidates[candidates != exclude]
+        distances = np.hypot(*(self.positions[candidates] - point).T)
+        return candidates[distances <= radius]
+
+class NodePool:
+    """A set of nodes of a GridIndex that are taken out one at a time, answering nearest queries over the ones left.
+
+    Every cell keeps a count of its nodes still in the pool, so the ring
+    search skips emptied cells without looking at their nodes.
+    """
+    def __init__(self, index, nodes = None):
+        self.index = index
+        node_count = len(index.positions)
+        self.available = np.zeros(node_count, dtype=bool)
+        self.available[np.arange(node_count) if nodes is None else nodes] = True
+        self.remaining = np.bincount(index.cell_ids[self.available], minlength=index.columns * index.rows)
+        self.count = int(self.available.sum())
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, node):
+        return bool(self.available[node])
+
+    def take(self, node):
+        if self.available[node]:
+            self.available[node] = False
+            self.remaining[self.index.cell_ids[node]] -= 1
+            self.count -= 1
+
+    def nearest(self, point):
+        """ID of the node left in the pool that is closest to point, None once the pool is empty."""
+        if not self.count:
+            return None
+        index = self.index
+        point = np.asarray(point, dtype=np.float64)
+        column, row = index.cell_of(point).tolist()
+        best_node, best_distance = None, np.inf
+        for radius in range(max(index.columns, index.rows) + 1):
+            cells = index.ring_cells(column, row, radius)
+            for cell in cells[self.remaining[cells] > 0].tolist():
+                nodes = index.order[index.cell_start[cell]:index.cell_start[cell + 1]]
+                nodes = nodes[self.available[nodes]]
+                distances = np.hypot(*(index.positions[nodes] - point).T)
+                closest = int(np.argmin(distances))
+                if distances[closest] < best_distance:
+                    best_node, best_distance = int(nodes[closest]), distances[closest]
+            #Every node outside the rings searched so far is at least radius cells away
+            if best_node is not None and best_distance <= radius * index.cell_size:
+                break
+        return best_node
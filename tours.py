@@ -0,0 +1,245 @@
+"""Tour representations for the local search, both exposing the operations
+of Fredman et al.'s tour interface on node IDs:
+
+    next(a), prev(a)     the nodes after and before a
+    between(a, b, c)     whether b lies on the way from a forwards to c
+    flip(a, b, c, d)     with b = next(a) and d = next(c), replaces the edges
+                         (a, b) and (c, d) by (a, c) and (b, d)
+
+flip reverses whichever side of the tour is shorter, so the direction of
+next and prev may turn round. Every flip is appended to journal so callers
+can roll moves back.
+"""
+
+#Below this many nodes the two level list has no advantage over the array
+TWO_LEVEL_MINIMUM = 64
+
+class ArrayTour:
+    """Tour as a list of node IDs and the position of every node in it, flips are O(n).
+
+    positions, the inverse of order, can be passed in when the caller already
+    keeps it, otherwise it is built here.
+    """
+    def __init__(self, order, positions = None):
+        self.tour = list(order)
+        self.node_count = len(self.tour)
+        if positions is not None:
+            self.positions = list(positions)
+        else:
+            self.positions = [0] * self.node_count
+            for position, node in enumerate(self.tour):
+                self.positions[node] = position
+        self.journal = []
+
+    def __len__(self):
+        return self.node_count
+
+    def next(self, node):
+        position = self.positions[node] + 1
+        return self.tour[position if position < self.node_count else 0]
+
+    def prev(self, node):
+        return self.tour[self.positions[node] - 1]
+
+    def between(self, a, b, c):
+        positions = self.positions
+        position_a, position_b, position_c = positions[a], positions[b], positions[c]
+        if position_a <= position_c:
+            return position_a <= position_b <= position_c
+        return position_b >= position_a or position_b <= position_c
+
+    def flip(self, a, b, c, d):
+        self.journal.append((a, b, c, d))
+        tour, positions, node_count = self.tour, self.positions, self.node_count
+        inner = (positions[c] - positions[b]) % node_count + 1
+        if 2 * inner <= node_count:
+            left, length = positions[b], inner
+        else:
+            left, length = positions[d], node_count - inner
+        right = (left + length - 1) % node_count
+        for step in range(length // 2):
+            tour[left], tour[right] = tour[right], tour[left]
+            positions[tour[left]] = left
+            positions[tour[right]] = right
+            left = left + 1 if left + 1 < node_count else 0
+            right = right - 1 if right > 0 else node_count - 1
+
+    def order(self):
+        return self.tour
+
+class TwoLevelList:
+    """Tour split into about sqrt(n) segments, each a list of nodes with a reversal bit, flips are O(sqrt(n)).
+
+    The segments form a doubly-linked cycle numbered by rank. A flip first
+    splits the segments at the ends of the path so the path is made of whole
+    segments, then reverses the shorter run of segments by relinking them and
+    toggling their bits. Splits add segments, so the list is rebuilt once
+    there are twice as many as at the start.
+    """
+    def __init__(self, order, group_size = None):
+        order = list(order)
+        self.node_count = len(order)
+        self.group_size = group_size or max(8, int(self.node_count ** 0.5))
+        self.segment_of = [0] * self.node_count
+        self.index = [0] * self.node_count
+        self.journal = []
+        self.build(order)
+
+    def build(self, order):
+        #Node lists of the segments in their own order, read backwards when the segment is reversed
+        self.segments = [order[start:start + self.group_size] for start in range(0, self.node_count, self.group_size)]
+        segment_count = len(self.segments)
+        self.reversed = [False] * segment_count
+        self.segment_next = [(segment + 1) % segment_count for segment in range(segment_count)]
+        self.segment_prev = [(segment - 1) % segment_count for segment in range(segment_count)]
+        self.rank = list(range(segment_count))
+        self.segment_count = segment_count
+        self.segment_limit = 2 * segment_count + 2
+        for segment, nodes in enumerate(self.segments):
+            self.reindex(segment, 0)
+
+    def __len__(self):
+        return self.node_count
+
+    def reindex(self, segment, start):
+        segment_of, index = self.segment_of, self.index
+        nodes = self.segments[segment]
+        for position in range(start, len(nodes)):
+            node = nodes[position]
+            segment_of[node] = segment
+            index[node] = position
+
+    def head(self, segment):
+        nodes = self.segments[segment]
+        return nodes[-1] if self.reversed[segment] else nodes[0]
+
+    def tail(self, segment):
+        nodes = self.segments[segment]
+        return nodes[0] if self.reversed[segment] else nodes[-1]
+
+    def next(self, node):
+        segment = self.segment_of[node]
+        position = self.index[node]
+        if self.reversed[segment]:
+            if position > 0:
+                return self.segments[segment][position - 1]
+        elif position + 1 < len(self.segments[segment]):
+            return self.segments[segment][position + 1]
+        return self.head(self.segment_next[segment])
+
+    def prev(self, node):
+        segment = self.segment_of[node]
+        position = self.index[node]
+        if self.reversed[segment]:
+            if position + 1 < len(self.segments[segment]):
+                return self.segments[segment][position + 1]
+        elif position > 0:
+            return self.segments[segment][position - 1]
+        return self.tail(self.segment_prev[segment])
+
+    def sequence_key(self, node):
+        segment = self.segment_of[node]
+        position = self.index[node]
+        if self.reversed[segment]:
+            position = len(self.segments[segment]) - 1 - position
+        return self.rank[segment], position
+
+    def between(self, a, b, c):
+        key_a, key_b, key_c = self.sequence_key(a), self.sequence_key(b), self.sequence_key(c)
+        if key_a <= key_c:
+            return key_a <= key_b <= key_c
+        return key_b >= key_a or key_b <= key_c
+
+    def split(self, segment, cut):
+        """Moves the nodes from list index cut on into a new segment, placed so the tour order is unchanged."""
+        nodes = self.segments[segment]
+        new_segment = len(self.segments)
+        self.segments.append(nodes[cut:])
+        del nodes[cut:]
+        self.reversed.append(self.reversed[segment])
+        self.segment_next.append(0)
+        self.segment_prev.append(0)
+        self.rank.append(0)
+        if self.reversed[segment]:
+            #Reversed segments are read from the end, so the cut off part comes first
+            before = self.segment_prev[segment]
+            self.segment_next[before], self.segment_prev[new_segment] = new_segment, before
+            self.segment_next[new_segment], self.segment_prev[segment] = segment, new_segment
+        else:
+            after = self.segment_next[segment]
+            self.segment_next[segment], self.segment_prev[new_segment] = new_segment, segment
+            self.segment_next[new_segment], self.segment_prev[after] = after, new_segment
+        self.segment_count += 1
+        self.reindex(new_segment, 0)
+
+    def split_before(self, node):
+        """Splits the segment of node so node is the first of its segment."""
+        segment = self.segment_of[node]
+        if self.head(segment) != node:
+            self.split(segment, self.index[node] + 1 if self.reversed[segment] else self.index[node])
+
+    def split_after(self, node):
+        """Splits the segment of node so node is the last of its segment."""
+        segment = self.segment_of[node]
+        if self.tail(segment) != node:
+            self.split(segment, self.index[node] if self.reversed[segment] else self.index[node] + 1)
+
+    def renumber(self):
+        segment = self.segment_of[0] if self.node_count else 0
+        for rank in range(self.segment_count):
+            self.rank[segment] = rank
+            segment = self.segment_next[segment]
+
+    def flip(self, a, b, c, d):
+        self.journal.append((a, b, c, d))
+        if b == c or a == d:
+            return
+        if self.segment_count + 2 > self.segment_limit:
+            self.build(self.order())
+        self.split_before(b)
+        self.split_after(c)
+        self.renumber()
+        first, last = self.segment_of[b], self.segment_of[c]
+        length = (self.rank[last] - self.rank[first]) % self.segment_count + 1
+        if 2 * length > self.segment_count:
+            #The rest of the tour is made of whole segments too and is the shorter run to reverse
+            first, last = self.segment_of[d], self.segment_of[a]
+            length = self.segment_count - length
+        run = [first]
+        for step in range(length - 1):
+            run.append(self.segment_next[run[-1]])
+        before, after = self.segment_prev[first], self.segment_next[last]
+        ranks = [self.rank[segment] for segment in run]
+        run.reverse()
+        previous = before
+        for segment, rank in zip(run, ranks):
+            self.reversed[segment] = not self.reversed[segment]
+            self.rank[segment] = rank
+            self.segment_prev[segment] = previous
+            self.segment_next[previous] = segment
+            previous = segment
+        self.segment_next[previous] = after
+        self.segment_prev[after] = previous
+
+    def order(self):
+        """Node IDs in tour order, starting with node 0."""
+        order = []
+        if not self.node_count:
+            return order
+        segment = self.segment_of[0]
+        for step in range(self.segment_count):
+            nodes = self.segments[segment]
+            order.extend(reversed(nodes) if self.reversed[segment] else nodes)
+            segment = self.segment_next[segment]
+        start = order.index(0)
+        return order[start:] + order[:start]
+
+TOUR_BACKINGS = {"array": ArrayTour, "two_level": TwoLevelList}
+
+def tour_backing(name, order):
+    """Builds the named representation of a tour, tiny tours always use the array."""
+    if name not in TOUR_BACKINGS:
+        raise ValueError("Unknown tour backing: " + str(name))
+    if len(order) < TWO_LEVEL_MINIMUM:
+        return ArrayTour(order)
+    return TOUR_BACKINGS[name](order)
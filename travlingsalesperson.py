@@ -1,6 +1,18 @@
-import pygame
-import random
+import argparse
+import hashlib
+import heapq
+import os
 import copy
+import time
+from collections import OrderedDict
+import numpy as np
+from spatial_index import GridIndex, hilbert_keys
+import tsplib
+from metrics import PHASES, MetricsRecorder, sink_for_path
+from checkpoint import load_checkpoint, restore_population, save_checkpoint
+from local_search import KICKS as MUTATION_KICKS, improve_candidate, improve_tour
+from tours import TOUR_BACKINGS, ArrayTour
+from seeding import SEEDING_STRATEGIES, check_seeding, parse_seeding, seed_tours
 
 """Genetic algorithm needs:
         *Representation of solution: List of the order in which the nodes are reached
@@ -13,31 +25,187 @@ import copy
 """
 
 class Node:
-    def __init__(self, position, ID):
-        self.position = position
-        self.ID = ID
+    #A view of one row of Environment.positions
+    __slots__ = ("environment", "index", "ID")
+
+    def __init__(self, environment, index):
+        self.environment = environment
+        #Row of the node in positions and distance_matrix
+        self.index = index
+        #ID of the node in the input, the same as index unless the environment was renumbered
+        self.ID = int(environment.to_original(index))
 
     def __repr__(self):
         return str(self.ID)
 
+    @property
+    def position(self):
+        x, y = self.environment.positions[self.index]
+        return (float(x), float(y))
+
     def calc_dist(self, other):
-        selfX,selfY = self.position
-        otherX,otherY = other.position
-        distX = (selfX-otherX)**2
-        distY = (selfY-otherY)**2
-        distance = (distX+distY)**0.5
-        return distance
+        return self.environment.distance_matrix[self.index, other.index]
 
 class Environment:
-    def __init__(self,node_count,width,height):
+    #Metrics where nearest neighbours in the plane are also nearest by edge cost
+    PLANAR_METRICS = ("euclidean", "EUC_2D", "CEIL_2D", "ATT")
+
+    def __init__(self,node_count,width,height, positions = None, distance_matrix = None, metric = "euclidean", name = "random", matrix_cache = None, rng = None):
         self.node_count = node_count
+        #np.random.Generator used for building random worlds
+        self.rng = np.random.default_rng(rng)
         self.width = width
         self.height = height
-        self.node_list = []
-        self.buildRandomWorld()
+        #"euclidean" or one of the TSPLIB edge weight types
+        self.metric = metric
+        self.name = name
+        #Directory holding float32 distance matrices as .npy files, reopened memory-mapped
+        self.matrix_cache = matrix_cache
+        self.positions = np.empty((0, 2))
+        self.distance_matrix = None
+        #.npy file distance_matrix is mapped from when it comes from matrix_cache, so other processes can map it too
+        self.matrix_path = None
+        self.nodes = None
+        self.neighbour_cache = {}
+        self.grid_index = None
+        #original_ids[i] is the ID node i had before renumber(), None while the nodes keep their original IDs
+        self.original_ids = None
+        if positions is None:
+            self.buildRandomWorld()
+        else:
+            self.set_positions(positions, distance_matrix)
 
     def buildRandomWorld(self):
-        self.node_list = [Node((random.randrange(self.width), random.randrange(self.height)),i) for i in range(self.node_count)]
+        self.set_positions(np.column_stack((self.rng.integers(self.width, size=self.node_count), self.rng.integers(self.height, size=self.node_count))))
+
+    def set_positions(self, positions, distance_matrix = None):
+        #Coordinates of every node as one (node_count, 2) array, node IDs are the row indices
+        self.positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        self.node_count = len(self.positions)
+        self.nodes = None
+        self.neighbour_cache = {}
+        self.grid_index = None
+        self.matrix_path = None
+        if distance_matrix is None:
+            self.build_distance_matrix()
+        else:
+            self.distance_matrix = distance_matrix
+
+    @classmethod
+    def from_tsplib(cls, path, matrix_cache = None):
+        problem = tsplib.read_tsplib(path)
+        dimension = int(problem["DIMENSION"])
+        positions = problem["positions"]
+        if positions is None:
+            positions = np.zeros((dimension, 2))
+        width, height = (np.ceil(positions.max(axis=0)).astype(int) + 1).tolist() if dimension else (0, 0)
+        return cls(dimension, width, height, positions, problem["distance_matrix"], problem["EDGE_WEIGHT_TYPE"], problem.get("NAME", "tsplib"), matrix_cache)
+
+    @property
+    def node_list(self):
+        if self.nodes is None:
+            self.nodes = [Node(self, index) for index in range(self.node_count)]
+        return self.nodes
+
+    def build_distance_matrix(self, rows_per_block = 512):
+        #Dense matrix of every edge cost, the only place distances are computed
+        if self.matrix_cache is not None:
+            self.distance_matrix = self.cached_distance_matrix(rows_per_block)
+            return
+        #Filled in row blocks so the coordinate differences never need a (node_count, node_count, 2) temporary
+        self.distance_matrix = np.empty((self.node_count, self.node_count))
+        for start in range(0, self.node_count, rows_per_block):
+            end = min(start + rows_per_block, self.node_count)
+            self.distance_matrix[start:end] = self.distance_rows(start, end)
+
+    def distance_rows(self, start, end):
+        rows = tsplib.distances(self.positions[start:end], self.positions, self.metric)
+        rows[np.arange(end - start), np.arange(start, end)] = 0.0
+        return rows
+
+    def fingerprint(self):
+        #Identifies the problem, the matrix is only hashed when it is not computed from the positions (EXPLICIT instances)
+        digest = hashlib.sha1(self.metric.encode() + np.ascontiguousarray(self.positions).tobytes())
+        if self.metric not in tsplib.DISTANCE_FUNCTIONS:
+            digest.update(np.ascontiguousarray(self.distance_matrix).tobytes())
+        return digest.hexdigest()
+
+    def cached_distance_matrix(self, rows_per_block = 512):
+        key = self.fingerprint()
+        path = os.path.join(self.matrix_cache, key + ".npy")
+        if not os.path.exists(path):
+            os.makedirs(self.matrix_cache, exist_ok=True)
+            #Filled block by block through a temporary file so neither a full float64 matrix nor a half written cache ever exists
+            temporary_path = path + "." + str(os.getpid()) + ".tmp"
+            matrix = np.lib.format.open_memmap(temporary_path, mode="w+", dtype=np.float32, shape=(self.node_count, self.node_count))
+            for start in range(0, self.node_count, rows_per_block):
+                end = min(start + rows_per_block, self.node_count)
+                matrix[start:end] = self.distance_rows(start, end)
+            matrix.flush()
+            del matrix
+            os.replace(temporary_path, path)
+        self.matrix_path = path
+        #A plain ndarray view of the mapped pages, np.memmap indexing goes through Python code on every lookup
+        return np.asarray(np.load(path, mmap_mode="r"))
+
+    @property
+    def spatial_index(self):
+        #Built on first use and dropped by set_positions whenever the nodes change
+        if self.grid_index is None:
+            self.grid_index = GridIndex(self.positions)
+        return self.grid_index
+
+    @property
+    def has_coordinates(self):
+        #EXPLICIT instances only come with a matrix, their positions are placeholders
+        return self.metric in tsplib.DISTANCE_FUNCTIONS
+
+    def hilbert_order(self):
+        #Node IDs sorted along a Hilbert curve, an O(n log n) tour that is typically about 25% above the optimum on uniform
+        #instances, with only an O(log n) worst case ratio, so it is a quick baseline rather than a good tour
+        if not self.has_coordinates:
+            raise ValueError("Hilbert ordering needs node coordinates, not " + str(self.metric) + " distances")
+        return np.argsort(hilbert_keys(self.positions), kind="stable")
+
+    def renumber(self, order = None):
+        """Gives node order[i] the new ID i, by default in Hilbert curve order so nodes close in the plane get
+        close IDs and close rows of positions and distance_matrix. to_original() maps tours back to the old IDs."""
+        order = self.hilbert_order() if order is None else np.asarray(order)
+        positions = self.positions[order]
+        if self.matrix_cache is not None and self.metric in tsplib.DISTANCE_FUNCTIONS:
+            self.set_positions(positions)
+        else:
+            #Permuted rather than recomputed, EXPLICIT matrices cannot be recomputed at all
+            self.set_positions(positions, np.asarray(self.distance_matrix)[np.ix_(order, order)])
+        self.original_ids = order if self.original_ids is None else self.original_ids[order]
+        return self
+
+    def to_original(self, nodes):
+        #Node IDs from before renumber(), works on single IDs and on whole tours
+        return nodes if self.original_ids is None else self.original_ids[nodes]
+
+    def k_nearest(self, node, k):
+        return [self.node_list[node_id] for node_id in self.spatial_index.k_nearest(self.positions[node.index], k, exclude = node.index)]
+
+    def within_radius(self, node, radius):
+        return [self.node_list[node_id] for node_id in self.spatial_index.within_radius(self.positions[node.index], radius, exclude = node.index)]
+
+    def neighbour_lists(self, k):
+        #Row i holds the IDs of the k nodes closest to node i, nearest first
+        k = min(k, self.node_count - 1)
+        if k not in self.neighbour_cache and self.metric not in self.PLANAR_METRICS:
+            distances = self.distance_matrix.copy()
+            np.fill_diagonal(distances, np.inf)
+            nearest = np.argpartition(distances, k - 1, axis=1)[:, :k] if k > 0 else np.empty((self.node_count, 0), dtype=np.intp)
+            order = np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1, kind="stable")
+            self.neighbour_cache[k] = np.take_along_axis(nearest, order, axis=1)
+        if k not in self.neighbour_cache:
+            index = self.spatial_index
+            neighbours = np.empty((self.node_count, max(k, 0)), dtype=np.intp)
+            for node_id in range(self.node_count):
+                neighbours[node_id] = index.k_nearest(self.positions[node_id], k, exclude = node_id)
+            self.neighbour_cache[k] = neighbours
+        return self.neighbour_cache[k]
 
     def print_matrix(self):
         matrix = []
@@ -45,7 +213,7 @@ class Environment:
             matrix_row = [i, []]
             for n in self.node_list:
                 if i != n:
-                    matrix_row[1].append((n,i.calc_dist(n)))
+                    matrix_row[1].append((n,float(self.distance_matrix[i.index, n.index])))
             matrix.append(matrix_row)
         for i in matrix:
             print(i)
@@ -53,124 +221,675 @@ class Environment:
 
 
 class Population:
-    def __init__(self, population_size,environment):
+    def __init__(self, population_size,environment, crossover_operator = "order", local_search = None, neighbour_count = 8, selection = "tournament", tournament_size = 2,
+            hall_of_fame_size = 10, fitness_cache_size = 0, rng = None, lk_depth = 0, tour_backing = "array", seeding = None):
         self.population_size = population_size
+        #Every random draw of the population and its operators comes from this np.random.Generator
+        self.rng = np.random.default_rng(rng)
         self.environment = environment
-        self.population_list = [Candidate(environment,environment.node_list,True) for i in range(self.population_size)]
-    
+        self.hall_of_fame = HallOfFame(hall_of_fame_size)
+        self.fitness_cache = FitnessCache(fitness_cache_size) if fitness_cache_size > 0 else None
+        #Wall time spent in each phase and number of tours costed over the whole run, read by metrics.MetricsRecorder
+        self.phase_times = dict.fromkeys(PHASES, 0.0)
+        self.evaluation_count = 0
+        self.crossover_operator = CROSSOVER_OPERATORS[crossover_operator]
+        self.selection_method = SELECTION_METHODS[selection]
+        self.tournament_size = tournament_size
+        if local_search not in (None, "elites", "offspring"):
+            raise ValueError("Unknown local search target: " + str(local_search))
+        #Apply 2-opt/Or-opt every generation to the elites or to the new offspring, Lin-Kernighan chains instead of 2-opt with lk_depth set
+        self.local_search = local_search
+        self.neighbour_count = neighbour_count
+        self.lk_depth = lk_depth
+        #Tour representation the local search runs on, the two level list pays off from about 10k nodes
+        self.tour_backing = tour_backing
+        node_count = environment.node_count
+        #Each row is one solution, stored as the IDs of the nodes in the order they are reached
+        #seeding ({strategy: share}) builds part of the first generation with seeding.py heuristics, the rest is random
+        self.tours = seed_tours(environment, self.population_size, seeding, self.rng)
+        self.positions = inverse_positions(self.tours)
+        self.costs = self.evaluate(self.tours)
+
+    @property
+    def population_list(self):
+        return [self.candidate(index) for index in range(len(self.tours))]
+
+    def candidate(self, index):
+        return Candidate(self.environment, self.tours[index].copy(), cost = float(self.costs[index]))
+
+    def evaluate_all(self, tours = None):
+        if tours is None:
+            tours = self.tours
+        distance_matrix = self.environment.distance_matrix
+        return distance_matrix[tours, np.roll(tours, -1, axis=1)].sum(axis=1, dtype=np.float64)
+
+    def evaluate(self, tours):
+        #Same as evaluate_all, but tours already in the fitness cache are not summed again
+        self.evaluation_count += len(tours)
+        if self.fitness_cache is None:
+            return self.evaluate_all(tours)
+        return self.fitness_cache.evaluate(tours, self.evaluate_all)
+
+    def set_generation(self, tours, known_costs = None):
+        #known_costs holds the costs of the first len(known_costs) tours, e.g. the elites carried over unchanged
+        self.tours = tours
+        self.positions = inverse_positions(self.tours)
+        if known_costs is None:
+            self.costs = self.evaluate(self.tours)
+        else:
+            if self.environment.distance_matrix.dtype != np.float64:
+                #Move deltas on a float32 matrix are rounded, summed again so carried over costs cannot drift from the tour lengths
+                known_costs = self.evaluate_all(self.tours[:len(known_costs)])
+            self.costs = np.concatenate((known_costs, self.evaluate(self.tours[len(known_costs):])))
+
     def select_fittest(self, fitest_count = 4):
-        self.population_list.sort(key=lambda solution: solution.cost)
-        return self.population_list[:fitest_count]
+        #Only the fitest_count cheapest tours get sorted, the rest of the population is just partitioned off
+        return cheapest(self.costs, fitest_count)
 
     def select_parents(self, parents_amount = 2):
-        candidates = []
-        population = self.population_list
-        while(len(candidates) < parents_amount):
-            candidate_A, candidate_B = tuple(random.sample(population,2))
-            if candidate_A not in candidates and candidate_B not in candidates:
-                strongest_candidate = candidate_A if candidate_A.cost < candidate_B.cost else candidate_B
-                candidates.append(strongest_candidate)
-        return candidates
+        if self.selection_method is tournament_selection:
+            return tournament_selection(self.costs, parents_amount, self.rng, self.tournament_size)
+        return self.selection_method(self.costs, parents_amount, self.rng)
 
     def breed_new_solutions(self,parents,target_count):
-        next_gneration_children = []
-        while len(next_gneration_children) < target_count:
-            parentA = random.choice(parents)
-            parentB = random.choice([solution for solution in self.population_list if solution != parentA])
-            next_gneration_children.append(self.crossover(parentA,parentB))
+        population_count, node_count = self.tours.shape
+        #All parents and cut points of the generation come from a handful of vectorized draws
+        parents_A = np.asarray(parents)[self.rng.integers(len(parents), size=target_count)]
+        #Any other member of the population, drawn without building the list of candidates
+        parents_B = self.rng.integers(population_count - 1, size=target_count)
+        parents_B += parents_B >= parents_A
+        start_genes = self.rng.integers(max(node_count, 1), size=target_count)
+        end_genes = self.rng.integers(start_genes, max(node_count, 1))
+        next_gneration_children = np.empty((target_count, node_count), dtype=np.int32)
+        for child, (parentA, parentB, start_gene, end_gene) in enumerate(zip(parents_A.tolist(), parents_B.tolist(), start_genes.tolist(), end_genes.tolist())):
+            next_gneration_children[child] = self.crossover(self.tours[parentA],self.tours[parentB], (start_gene, end_gene))
         return next_gneration_children
 
-    def crossover(self,parent_A,parent_B):
-        inheritance_A = []
-        inheritance_B = []
-        start_gene = random.randrange(len(parent_A.solution))
-        end_gene = random.randrange(start_gene ,len(parent_A.solution))
-        for i in range(start_gene, end_gene):
-            inheritance_A.append(parent_A.solution[i])
-        inheritance_B = [item for item in parent_B.solution if item not in inheritance_A]
-        return Candidate(self.environment, inheritance_A + inheritance_B) 
-
-    def mutate(self, mutation_chance):
-        for solution in self.population_list:
-            if random.random() < mutation_chance:
-                amount_of_elements_to_swap = random.randrange(1,len(solution.solution)//3)
-                random_swap_elements = random.sample(solution.solution, amount_of_elements_to_swap)
-                while random_swap_elements:
-                    element = random_swap_elements[0]
-                    new_index = random.randrange(len(solution.solution))
-                    if new_index != list.index(solution.solution, element):
-                        solution.solution[new_index],solution.solution[list.index(solution.solution, element)] = solution.solution[list.index(solution.solution, element)],solution.solution[new_index]
-                        random_swap_elements.pop(0)
-            
+    def crossover(self,parent_A,parent_B, cut_points = None):
+        return self.crossover_operator(parent_A, parent_B, self.rng, cut_points)
+
+    def next_generation(self, mutation_rate, mutation_operator = "swap", best_candidates = None):
+        phase_start = time.perf_counter()
+        if best_candidates is None:
+            best_candidates = self.select_fittest()
+        self.hall_of_fame.update(self.tours[best_candidates], self.costs[best_candidates])
+        parents = self.select_parents(4)
+        phase_start = self.add_phase_time("selection", phase_start)
+        offspring_count = self.population_size - len(best_candidates)
+        offsprings = self.breed_new_solutions(parents,offspring_count)
+        phase_start = self.add_phase_time("breeding", phase_start)
+        self.set_generation(np.concatenate((self.tours[best_candidates], offsprings)), self.costs[best_candidates])
+        phase_start = self.add_phase_time("evaluation", phase_start)
+        self.mutate(mutation_rate, mutation_operator)
+        phase_start = self.add_phase_time("mutation", phase_start)
+        if self.local_search == "elites":
+            self.improve(range(len(best_candidates)))
+        elif self.local_search == "offspring":
+            self.improve(range(len(best_candidates), self.population_size))
+        self.add_phase_time("local_search", phase_start)
+
+    def add_phase_time(self, phase, phase_start):
+        now = time.perf_counter()
+        self.phase_times[phase] += now - phase_start
+        return now
+
+    def improve(self, indices):
+        distance_matrix = self.environment.distance_matrix
+        neighbours = self.environment.neighbour_lists(self.neighbour_count)
+        for index in indices:
+            self.costs[index] += improve_tour(distance_matrix, self.tours[index], neighbours, self.positions[index], lk_depth = self.lk_depth, backing = self.tour_backing)
+
+    def kick(self, indices, kick):
+        #One random Or-opt or double bridge move per tour, applied by the local search move engine
+        distance_matrix = self.environment.distance_matrix
+        for index in indices.tolist():
+            tour = ArrayTour(self.tours[index].tolist(), self.positions[index].tolist())
+            delta = kick(distance_matrix, tour, self.rng)[0]
+            self.tours[index] = tour.tour
+            self.positions[index] = tour.positions
+            self.costs[index] += delta
+
+    def replace_worst(self, tours):
+        tours = tours[:len(self.costs)]
+        worst = np.argpartition(self.costs, len(self.costs) - len(tours))[len(self.costs) - len(tours):] if len(tours) else np.empty(0, dtype=np.intp)
+        self.tours[worst] = tours
+        self.positions[worst] = inverse_positions(self.tours[worst])
+        self.costs[worst] = self.evaluate(self.tours[worst])
+
+    def mutate(self, mutation_chance, move = "swap"):
+        distance_matrix = self.environment.distance_matrix
+        population_count, node_count = self.tours.shape
+        if node_count < 3:
+            return
+        #Which tours mutate, how many genes each and which ones, drawn for the whole generation at once
+        mutating = np.flatnonzero(self.rng.random(population_count) < mutation_chance)
+        if move in MUTATION_KICKS:
+            self.kick(mutating, MUTATION_KICKS[move])
+            return
+        amounts = self.rng.integers(1,max(2, node_count//3), size=len(mutating))
+        ends = np.cumsum(amounts).tolist()
+        random_swap_elements = self.rng.integers(node_count, size=ends[-1] if ends else 0)
+        new_indices = self.rng.integers(node_count - 1, size=len(random_swap_elements)).tolist()
+        apply_move = MUTATION_MOVES.get(move)
+        start = 0
+        for index, end in zip(mutating.tolist(), ends):
+            tour = self.tours[index]
+            positions = self.positions[index]
+            if move == "scramble":
+                scramble_positions = np.unique(positions[random_swap_elements[start:end]])
+                self.costs[index] += scramble_move(distance_matrix, tour, scramble_positions, self.rng, positions)
+                start = end
+                continue
+            for element, new_index in zip(random_swap_elements[start:end].tolist(), new_indices[start:end]):
+                current_index = int(positions[element])
+                #Drawn from every index except the current one so no redraw is ever needed
+                if new_index >= current_index:
+                    new_index += 1
+                self.costs[index] += apply_move(distance_matrix, tour, current_index, new_index, positions)
+            start = end
+
+
+class HallOfFame:
+    """The best distinct tours seen over the whole run, kept in a heap so updates never sort."""
+    def __init__(self, size = 10):
+        self.size = size
+        #Max-heap on cost through negated costs, the root is the entry to evict next
+        self.heap = []
+        self.tours = {}
+        self.entry_counter = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def update(self, tours, costs):
+        #Keyed by cycle, so the same tour from another start node or in the other direction takes no second slot
+        for tour, cost, key in zip(tours, costs.tolist(), canonical_tour_keys(tours)):
+            if key in self.tours:
+                continue
+            self.entry_counter += 1
+            if len(self.heap) < self.size:
+                heapq.heappush(self.heap, (-cost, self.entry_counter, key))
+            elif cost < -self.heap[0][0]:
+                evicted = heapq.heapreplace(self.heap, (-cost, self.entry_counter, key))
+                del self.tours[evicted[2]]
+            else:
+                continue
+            self.tours[key] = tour.copy()
+
+    def best(self, count = None):
+        """(cost, tour) pairs, cheapest first."""
+        entries = heapq.nlargest(len(self.heap) if count is None else count, self.heap)
+        return [(-cost, self.tours[key]) for cost, entry_counter, key in entries]
+
+class FitnessCache:
+    """Bounded LRU map from canonical tour to cost, so duplicate tours are looked up instead of summed."""
+    def __init__(self, size):
+        self.size = size
+        self.costs = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return "hits: " + str(self.hits) + " misses: " + str(self.misses)
+
+    def evaluate(self, tours, evaluate_all):
+        keys = canonical_tour_keys(tours)
+        costs = np.empty(len(tours))
+        missing = []
+        for index, key in enumerate(keys):
+            cost = self.costs.get(key)
+            if cost is None:
+                missing.append(index)
+            else:
+                self.costs.move_to_end(key)
+                costs[index] = cost
+        self.hits += len(tours) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            costs[missing] = evaluate_all(tours[missing])
+            for index in missing:
+                self.costs[keys[index]] = costs[index]
+            while len(self.costs) > self.size:
+                self.costs.popitem(last=False)
+        return costs
 
-                
+def canonical_tour_keys(tours):
+    """8 byte digests that are equal for tours describing the same cycle, whatever the start node or direction."""
+    node_count = tours.shape[1]
+    if node_count == 0:
+        return [b""] * len(tours)
+    starts = np.argmin(tours, axis=1)
+    rotated = np.take_along_axis(tours, (starts[:, np.newaxis] + np.arange(node_count)) % node_count, axis=1)
+    if node_count > 2:
+        flip = rotated[:, 1] > rotated[:, -1]
+        rotated[flip, 1:] = rotated[flip, :0:-1]
+    return [hashlib.blake2b(tour, digest_size=8).digest() for tour in np.ascontiguousarray(rotated)]
+
+def cheapest(costs, count):
+    """Indices of the count lowest costs in ascending order, O(n + count log count)."""
+    if count >= len(costs):
+        return np.argsort(costs, kind="stable")
+    if count <= 0:
+        return np.empty(0, dtype=np.intp)
+    selected = np.argpartition(costs, count - 1)[:count]
+    return selected[np.argsort(costs[selected], kind="stable")]
+
+def inverse_positions(tours):
+    """For every tour, the position each node ID is found at."""
+    positions = np.empty_like(tours)
+    np.put_along_axis(positions, tours, np.broadcast_to(np.arange(tours.shape[1]), tours.shape), axis=1)
+    return positions
+
+def swap_move(distance_matrix, tour, i, j, positions = None):
+    """Swaps the nodes at positions i and j in place and returns the change in tour length."""
+    node_count = len(tour)
+    #Edges are named by the position they start at, a set so adjacent positions are not counted twice
+    edges = {(i - 1) % node_count, i, (j - 1) % node_count, j % node_count}
+    before = sum(distance_matrix[tour[k], tour[(k + 1) % node_count]] for k in edges)
+    tour[i], tour[j] = tour[j], tour[i]
+    after = sum(distance_matrix[tour[k], tour[(k + 1) % node_count]] for k in edges)
+    if positions is not None:
+        positions[tour[i]] = i
+        positions[tour[j]] = j
+    return float(after) - float(before)
+
+def scramble_move(distance_matrix, tour, indices, rng, positions = None):
+    """Shuffles the nodes found at the given positions among themselves and returns the change in tour length."""
+    node_count = len(tour)
+    indices = np.asarray(indices)
+    edges = set(indices.tolist()) | set(((indices - 1) % node_count).tolist())
+    before = sum(distance_matrix[tour[k], tour[(k + 1) % node_count]] for k in edges)
+    nodes = tour[indices]
+    rng.shuffle(nodes)
+    tour[indices] = nodes
+    after = sum(distance_matrix[tour[k], tour[(k + 1) % node_count]] for k in edges)
+    if positions is not None:
+        positions[nodes] = indices
+    return float(after) - float(before)
+
+def insert_move(distance_matrix, tour, i, j, positions = None):
+    """Moves the node at position i so it ends up at position j and returns the change in tour length."""
+    node_count = len(tour)
+    node = tour[i]
+    previous_node = tour[i - 1]
+    next_node = tour[(i + 1) % node_count]
+    delta = distance_matrix[previous_node, next_node] - distance_matrix[previous_node, node] - distance_matrix[node, next_node]
+    #Neighbours of position j once node has been taken out of the tour
+    def reduced(k):
+        k %= node_count - 1
+        return tour[k + 1] if k >= i else tour[k]
+    before_node = reduced(j - 1)
+    after_node = reduced(j)
+    delta += distance_matrix[before_node, node] + distance_matrix[node, after_node] - distance_matrix[before_node, after_node]
+    if i < j:
+        tour[i:j] = tour[i + 1:j + 1].copy()
+    elif j < i:
+        tour[j + 1:i + 1] = tour[j:i].copy()
+    tour[j] = node
+    if positions is not None:
+        low, high = min(i, j), max(i, j)
+        positions[tour[low:high + 1]] = np.arange(low, high + 1)
+    return float(delta)
+
+def reverse_move(distance_matrix, tour, i, j, positions = None):
+    """Reverses the segment between positions i and j (2-opt) and returns the change in tour length."""
+    if j < i:
+        i, j = j, i
+    node_count = len(tour)
+    delta = 0.0
+    if j - i < node_count - 1:
+        first, last = tour[i], tour[j]
+        before_node, after_node = tour[i - 1], tour[(j + 1) % node_count]
+        delta = (distance_matrix[before_node, last] + distance_matrix[first, after_node]
+            - distance_matrix[before_node, first] - distance_matrix[last, after_node])
+    tour[i:j + 1] = tour[i:j + 1][::-1].copy()
+    if positions is not None:
+        positions[tour[i:j + 1]] = np.arange(i, j + 1)
+    return float(delta)
+
+#Scramble moves a whole set of positions at once and is handled separately by Population.mutate,
+#as are the Or-opt and double bridge kicks of MUTATION_KICKS, which make one move per mutated tour
+MUTATION_MOVES = {"swap": swap_move, "insert": insert_move, "reverse": reverse_move}
+
+def random_cut_points(node_count, rng):
+    start_gene = rng.integers(node_count)
+    return start_gene, rng.integers(start_gene ,node_count)
+
+#Crossover operators take the parents, the Generator and optionally the (start, end) slice drawn in advance
+
+def order_crossover(parent_A, parent_B, rng, cut_points = None):
+    """Keeps a random slice of parent A and fills up with the remaining nodes in the order of parent B."""
+    start_gene, end_gene = cut_points if cut_points is not None else random_cut_points(len(parent_A), rng)
+    inheritance_A = parent_A[start_gene:end_gene]
+    taken = np.zeros(len(parent_A), dtype=bool)
+    taken[inheritance_A] = True
+    inheritance_B = parent_B[~taken[parent_B]]
+    return np.concatenate((inheritance_A, inheritance_B))
+
+def partially_mapped_crossover(parent_A, parent_B, rng, cut_points = None):
+    """PMX: copies a slice of parent A in place and repairs the rest of parent B through the slice mapping."""
+    node_count = len(parent_A)
+    start_gene, end_gene = cut_points if cut_points is not None else random_cut_points(node_count, rng)
+    child = parent_B.copy()
+    child[start_gene:end_gene] = parent_A[start_gene:end_gene]
+    taken = np.zeros(node_count, dtype=bool)
+    taken[parent_A[start_gene:end_gene]] = True
+    position_in_A = np.empty(node_count, dtype=np.intp)
+    position_in_A[parent_A] = np.arange(node_count)
+    for index in np.flatnonzero(taken[parent_B]):
+        if start_gene <= index < end_gene:
+            continue
+        node = parent_B[index]
+        while taken[node]:
+            node = parent_B[position_in_A[node]]
+        child[index] = node
+    return child
+
+def edge_recombination_crossover(parent_A, parent_B, rng, cut_points = None):
+    """ERX: builds the child from the union of both parents' edges, preferring nodes with the fewest edges left."""
+    node_count = len(parent_A)
+    neighbours = [set() for i in range(node_count)]
+    for parent in (parent_A.tolist(), parent_B.tolist()):
+        for index, node in enumerate(parent):
+            neighbours[node].add(parent[index - 1])
+            neighbours[node].add(parent[(index + 1) % node_count])
+    taken = np.zeros(node_count, dtype=bool)
+    #Fallback order for dead ends, walked once so the whole child stays linear
+    unvisited = rng.permutation(node_count).tolist()
+    unvisited_pointer = 0
+    tie_breaks = rng.random(node_count).tolist()
+    child = np.empty(node_count, dtype=parent_A.dtype)
+    node = int(parent_A[0])
+    for index in range(node_count):
+        child[index] = node
+        taken[node] = True
+        for neighbour in tuple(neighbours[node]):
+            neighbours[neighbour].discard(node)
+        if neighbours[node]:
+            fewest = min(len(neighbours[neighbour]) for neighbour in neighbours[node])
+            fewest_neighbours = sorted(neighbour for neighbour in neighbours[node] if len(neighbours[neighbour]) == fewest)
+            node = fewest_neighbours[int(tie_breaks[index] * len(fewest_neighbours))]
+        elif index < node_count - 1:
+            while taken[unvisited[unvisited_pointer]]:
+                unvisited_pointer += 1
+            node = unvisited[unvisited_pointer]
+    return child
+
+CROSSOVER_OPERATORS = {"order": order_crossover, "pmx": partially_mapped_crossover, "edge": edge_recombination_crossover}
+
+#Selection methods take the cost array of the population and return the indices of the chosen parents
+
+def tournament_selection(costs, count, rng, tournament_size = 2):
+    """Each parent is the cheapest of tournament_size random members, tournaments share no members while the population allows it."""
+    population_count = len(costs)
+    tournament_size = max(1, min(tournament_size, population_count))
+    contestants = rng.choice(population_count, count * tournament_size, replace=count * tournament_size > population_count)
+    contestants = contestants.reshape(count, tournament_size)
+    return contestants[np.arange(count), np.argmin(costs[contestants], axis=1)]
+
+def sample_by_weight(weights, pointers):
+    cumulative = np.cumsum(weights)
+    return np.minimum(np.searchsorted(cumulative, pointers * cumulative[-1], side="right"), len(weights) - 1)
+
+def roulette_selection(costs, count, rng):
+    """Chance of being picked proportional to 1 / cost."""
+    pointers = rng.random(count)
+    return sample_by_weight(1.0 / np.maximum(costs, 1e-12), pointers)
+
+def rank_selection(costs, count, rng):
+    """Chance of being picked proportional to rank, the cheapest tour weighs population_size and the most expensive 1."""
+    weights = np.empty(len(costs))
+    weights[np.argsort(costs, kind="stable")] = np.arange(len(costs), 0, -1)
+    pointers = rng.random(count)
+    return sample_by_weight(weights, pointers)
+
+def stochastic_universal_selection(costs, count, rng):
+    """Roulette weights with count evenly spaced pointers from a single random offset."""
+    pointers = (rng.random() + np.arange(count)) / count
+    return sample_by_weight(1.0 / np.maximum(costs, 1e-12), pointers)
+
+SELECTION_METHODS = {"tournament": tournament_selection, "rank": rank_selection, "sus": stochastic_universal_selection, "roulette": roulette_selection}
 
 
 class Candidate:
-    def __init__(self,environment, solution_list, shuffleSolution = False):
+    def __init__(self,environment, solution, shuffleSolution = False, cost = None, rng = None):
         self.environment = environment
-        self.solution = solution_list
+        #Node IDs in the order they are reached
+        self.solution = np.array(solution, dtype=np.int32)
         if shuffleSolution:
-            random.shuffle(self.solution)
-        self.cost = self.fitness_function()
+            np.random.default_rng(rng).shuffle(self.solution)
+        self.cost = self.fitness_function() if cost is None else cost
             
 
     def __repr__(self):
         return str(self.cost)
 
     def fitness_function(self):
-        cost = 0
-        for node_index in range(len(self.solution)-1):
-            cost += self.solution[node_index].calc_dist(self.solution[node_index + 1])
-        cost += self.solution[-1].calc_dist(self.solution[0])
-        return cost
+        return float(self.environment.distance_matrix[self.solution, np.roll(self.solution, -1)].sum(dtype=np.float64))
+
+    def original_solution(self):
+        #The solution in the node IDs of the input, unaffected by Environment.renumber
+        return self.environment.to_original(self.solution)
+
+    def write_tour(self, path):
+        tsplib.write_tour(path, self.original_solution(), self.environment.name + ".tour", "Length " + str(self.cost))
 
     def draw(self,window):
+        import pygame
+        points = self.environment.positions[self.solution].tolist()
         window.fill((0,0,0))
-        pygame.draw.circle(window,(0,255,0),self.solution[0].position, 6)
-        for node in self.solution[1:]:
-            pygame.draw.circle(window,(255,255,255),node.position, 6)
-        for node_index in range(len(self.solution) - 1):
-            pygame.draw.line(window,(255,0,0),self.solution[node_index].position,self.solution[node_index+1].position,4)
-        pygame.draw.line(window,(255,0,0),self.solution[-1].position,self.solution[0].position,4)
+        pygame.draw.circle(window,(0,255,0),points[0], 6)
+        for point in points[1:]:
+            pygame.draw.circle(window,(255,255,255),point, 6)
+        for node_index in range(len(points) - 1):
+            pygame.draw.line(window,(255,0,0),points[node_index],points[node_index+1],4)
+        pygame.draw.line(window,(255,0,0),points[-1],points[0],4)
         pygame.display.update()
 
+def solve(environment, generations, population_size, mutation_rate, seed = None, on_generation = None, crossover_operator = "order", mutation_operator = "swap", local_search = None,
+        selection = "tournament", tournament_size = 2, fitness_cache_size = 0, metrics_sink = None, metrics_interval = 1, checkpoint_path = None, checkpoint_interval = 0, lk_depth = 0,
+        tour_backing = "array", seeding = None):
+    """Runs the genetic algorithm without any rendering.
+
+    on_generation is called with the iteration number and the best candidate of
+    that generation, returning False from it stops the run early. Its run time
+    is reported as the drawing phase.
+    metrics_sink, if given, receives a metrics record every metrics_interval generations.
+    checkpoint_path, if given, receives the full solver state every checkpoint_interval
+    generations and when the run ends, resume() continues the run from it.
+    lk_depth makes local_search use Lin-Kernighan chains of up to that many moves,
+    tour_backing picks the tours.py representation it runs on.
+    seeding maps seeding.py strategies to the share of the first generation they build.
+    seed may be an int, a np.random.SeedSequence or a Generator, the same seed gives the same run.
+    Returns the best candidate found and the lowest cost of every generation.
+    """
+    settings = {"population_size": population_size, "mutation_rate": mutation_rate, "crossover_operator": crossover_operator, "mutation_operator": mutation_operator,
+        "local_search": local_search, "selection": selection, "tournament_size": tournament_size, "fitness_cache_size": fitness_cache_size, "lk_depth": lk_depth,
+        "tour_backing": tour_backing, "seeding": seeding}
+    population = Population(population_size,environment,crossover_operator,local_search, selection = selection, tournament_size = tournament_size,
+        fitness_cache_size = fitness_cache_size, rng = np.random.default_rng(seed), lk_depth = lk_depth, tour_backing = tour_backing, seeding = seeding)
+    return run_generations(population, settings, 0, [], generations, on_generation, metrics_sink, metrics_interval, checkpoint_path, checkpoint_interval)
+
+def resume(path, environment, generations, on_generation = None, metrics_sink = None, metrics_interval = 1, checkpoint_path = None, checkpoint_interval = 0):
+    """Continues a run from a checkpoint written by solve until generations generations in total.
+
+    The run keeps the settings it was started with and ends exactly as it would
+    have without the interruption. checkpoint_path defaults to path, so the
+    checkpoint keeps moving forward with the run.
+    """
+    checkpoint = load_checkpoint(path)
+    settings = checkpoint["settings"]
+    population = Population(settings["population_size"], environment, settings["crossover_operator"], settings["local_search"], selection = settings["selection"],
+        tournament_size = settings["tournament_size"], fitness_cache_size = settings["fitness_cache_size"], lk_depth = settings.get("lk_depth", 0),
+        tour_backing = settings.get("tour_backing", "array"))
+    restore_population(population, checkpoint)
+    if checkpoint_path is None:
+        checkpoint_path = path
+    return run_generations(population, settings, checkpoint["generation"], checkpoint["cost_history"], generations, on_generation, metrics_sink, metrics_interval,
+        checkpoint_path, checkpoint_interval)
+
+def run_generations(population, settings, first_generation, cost_history, generations, on_generation, metrics_sink, metrics_interval, checkpoint_path, checkpoint_interval):
+    #The loop shared by solve and resume, iteration_counter is the number of generations bred so far
+    mutation_rate, mutation_operator = settings["mutation_rate"], settings["mutation_operator"]
+    recorder = MetricsRecorder(metrics_sink, metrics_interval, population) if metrics_sink is not None else None
+    for iteration_counter in range(first_generation, generations):
+        if checkpoint_path is not None and checkpoint_interval > 0 and iteration_counter % checkpoint_interval == 0 and iteration_counter != first_generation:
+            save_checkpoint(checkpoint_path, population, iteration_counter, cost_history, settings)
+        phase_start = time.perf_counter()
+        best_candidates = population.select_fittest()
+        phase_start = population.add_phase_time("selection", phase_start)
+        cost_history.append(float(population.costs[best_candidates[0]]))
+        if recorder is not None:
+            recorder.record(iteration_counter, population)
+            #The recorder's own time, diversity hashing included, belongs to no phase
+            phase_start = time.perf_counter()
+        if on_generation is not None:
+            keep_running = on_generation(iteration_counter, population.candidate(best_candidates[0]))
+            population.add_phase_time("drawing", phase_start)
+            if keep_running is False:
+                break
+        population.next_generation(mutation_rate, mutation_operator, best_candidates)
+    else:
+        iteration_counter = max(generations, first_generation)
+    if recorder is not None:
+        recorder.close()
+    if checkpoint_path is not None:
+        #Saved before the final hall of fame update so a resumed longer run matches an uninterrupted one
+        save_checkpoint(checkpoint_path, population, iteration_counter, cost_history, settings)
+    best_candidates = population.select_fittest()
+    population.hall_of_fame.update(population.tours[best_candidates], population.costs[best_candidates])
+    best_cost, best_tour = population.hall_of_fame.best(1)[0]
+    return Candidate(population.environment, best_tour, cost = best_cost), cost_history
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Genetic algorithm for the travling sales person problem")
+    parser.add_argument("--headless", action="store_true", help="run without opening a pygame window")
+    parser.add_argument("--nodes", type=int, default=25)
+    parser.add_argument("--tsplib", metavar="PATH", default=None, help="solve a TSPLIB .tsp instance instead of a random world")
+    parser.add_argument("--matrix-cache", metavar="DIR", default=None, help="keep distance matrices as memory-mapped float32 files in this directory")
+    parser.add_argument("--renumber", action="store_true", help="renumber the nodes along a Hilbert curve for memory locality, printed and written tours keep the input IDs")
+    parser.add_argument("--tour-output", metavar="PATH", default=None, help="write the best tour as a TSPLIB .tour file")
+    parser.add_argument("--population", type=int, default=30)
+    parser.add_argument("--generations", type=int, default=500)
+    parser.add_argument("--mutation-rate", type=float, default=0.15)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--crossover", choices=sorted(CROSSOVER_OPERATORS), default="order")
+    parser.add_argument("--mutation", choices=sorted(MUTATION_MOVES) + ["scramble"] + sorted(MUTATION_KICKS), default="swap")
+    parser.add_argument("--selection", choices=sorted(SELECTION_METHODS), default="tournament")
+    parser.add_argument("--tournament-size", type=int, default=2)
+    parser.add_argument("--fitness-cache", type=int, default=0, metavar="SIZE", help="remember the cost of up to SIZE distinct tours, hits and misses are reported in --metrics")
+    parser.add_argument("--metrics", metavar="PATH", default=None, help="write per-generation metrics, CSV for a .csv path and JSON lines otherwise")
+    parser.add_argument("--metrics-interval", type=int, default=1)
+    parser.add_argument("--local-search", choices=["elites", "offspring"], default=None, help="improve these tours with 2-opt/Or-opt every generation")
+    parser.add_argument("--lk-depth", type=int, default=0, help="use Lin-Kernighan chains of up to this many moves instead of 2-opt in local search and polishing")
+    parser.add_argument("--polish", type=int, default=0, metavar="KICKS", help="improve the final tour with this many double bridge kicks of iterated local search")
+    parser.add_argument("--tour-backing", choices=sorted(TOUR_BACKINGS), default="array", help="tour representation for local search, two_level has O(sqrt(n)) reversals")
+    parser.add_argument("--seeding", metavar="STRATEGY:SHARE,...", default=None,
+        help="build these shares of the first generation with " + ", ".join(sorted(SEEDING_STRATEGIES)) + ", e.g. nearest_neighbour:0.2,greedy:0.1")
+    parser.add_argument("--islands", type=int, default=1, help="evolve this many populations in parallel processes, implies --headless")
+    parser.add_argument("--migration-interval", type=int, default=25)
+    parser.add_argument("--topology", choices=["ring", "full"], default="ring")
+    parser.add_argument("--checkpoint", metavar="PATH", default=None, help="save the solver state to this .npz file periodically and at the end of the run")
+    parser.add_argument("--checkpoint-interval", type=int, default=1000, metavar="GENERATIONS")
+    parser.add_argument("--resume", action="store_true", help="continue the run saved in --checkpoint up to --generations, the world arguments must match the original run")
+    arguments = parser.parse_args()
+    if arguments.resume and arguments.checkpoint is None:
+        parser.error("--resume needs --checkpoint")
+    if arguments.checkpoint is not None and arguments.islands > 1:
+        parser.error("--checkpoint is not supported with --islands")
+    if arguments.seeding is not None:
+        try:
+            arguments.seeding = parse_seeding(arguments.seeding)
+        except ValueError as error:
+            parser.error("--seeding: " + str(error))
+    return parser, arguments
+
 def main():
+    parser, arguments = parse_arguments()
     screen_width = 800
     screen_height = 800
-    node_count = 25
-    population_size = 30
-    mutation_rate = 0.15
-    env = Environment(node_count,screen_width,screen_height)
+    #Independent streams for the world, the solver and the final polish, all reproducible from --seed
+    world_seed, solver_seed, polish_seed = np.random.SeedSequence(arguments.seed).spawn(3)
+    if arguments.tsplib is not None:
+        env = Environment.from_tsplib(arguments.tsplib, arguments.matrix_cache)
+    else:
+        env = Environment(arguments.nodes,screen_width,screen_height, matrix_cache = arguments.matrix_cache, rng = world_seed)
+    if arguments.seeding is not None:
+        #Whether every strategy fits the metric is only known once the instance is read
+        try:
+            check_seeding(arguments.seeding, env)
+        except ValueError as error:
+            parser.error("--seeding: " + str(error))
+    if arguments.renumber:
+        if not env.has_coordinates:
+            parser.error("--renumber needs node coordinates, " + str(env.metric) + " instances only have distances")
+        env.renumber()
+
+    def polish(best_candidate):
+        if arguments.polish > 0:
+            improve_candidate(best_candidate, kicks = arguments.polish, rng = polish_seed, lk_depth = arguments.lk_depth, backing = arguments.tour_backing)
+        return best_candidate
+
+    if arguments.islands > 1:
+        from islands import solve_islands
+        best_candidate, cost_history = solve_islands(env, arguments.islands, arguments.generations, arguments.population, arguments.mutation_rate,
+            seed = solver_seed, migration_interval = arguments.migration_interval, topology = arguments.topology,
+            crossover_operator = arguments.crossover, mutation_operator = arguments.mutation, local_search = arguments.local_search,
+            selection = arguments.selection, tournament_size = arguments.tournament_size, fitness_cache_size = arguments.fitness_cache, lk_depth = arguments.lk_depth,
+            tour_backing = arguments.tour_backing, seeding = arguments.seeding)
+        polish(best_candidate)
+        print(best_candidate.original_solution().tolist())
+        print("Iterations: " + str(arguments.generations), "Lowest score: " + str(best_candidate))
+        if arguments.tour_output is not None:
+            best_candidate.write_tour(arguments.tour_output)
+        return
+
+    metrics_sink = sink_for_path(arguments.metrics) if arguments.metrics is not None else None
+
+    def run(on_generation = None):
+        if arguments.resume:
+            return resume(arguments.checkpoint, env, arguments.generations, on_generation, metrics_sink, arguments.metrics_interval, checkpoint_interval = arguments.checkpoint_interval)
+        return solve(env, arguments.generations, arguments.population, arguments.mutation_rate, seed = solver_seed, on_generation = on_generation, crossover_operator = arguments.crossover, mutation_operator = arguments.mutation, local_search = arguments.local_search,
+            selection = arguments.selection, tournament_size = arguments.tournament_size, fitness_cache_size = arguments.fitness_cache,
+            metrics_sink = metrics_sink, metrics_interval = arguments.metrics_interval, checkpoint_path = arguments.checkpoint, checkpoint_interval = arguments.checkpoint_interval,
+            lk_depth = arguments.lk_depth, tour_backing = arguments.tour_backing, seeding = arguments.seeding)
+
+    if arguments.headless:
+        best_candidate, cost_history = run()
+        polish(best_candidate)
+        print(best_candidate.original_solution().tolist())
+        print("Iterations: " + str(len(cost_history)), "Lowest score: " + str(best_candidate))
+        if arguments.tour_output is not None:
+            best_candidate.write_tour(arguments.tour_output)
+        return
+
+    import pygame
     window = pygame.display.set_mode((screen_width,screen_height))
     pygame.display.set_caption("Genetic TSP")
-    population = Population(population_size,env)
-    running = True
     FPS = 300
     clock = pygame.time.Clock()
-    iterations_limit = 500
-    iteration_counter = 0
-    position_list = []
-    for i in env.node_list:
-        position_list.append(i.position)
+    running = True
+
+    def draw_generation(iteration_counter, best_candidate):
+        nonlocal running
+        clock.tick(FPS)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+                return False
+        best_candidate.draw(window)
+        print("Iteration: " + str(iteration_counter), "Lowest score: " + str(best_candidate))
 
+    best_candidate, cost_history = run(draw_generation)
+    if running and arguments.polish > 0:
+        polish(best_candidate).draw(window)
+    if arguments.tour_output is not None:
+        best_candidate.write_tour(arguments.tour_output)
     while running:
         clock.tick(FPS)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-        if iteration_counter < iterations_limit:
-            best_candidates = population.select_fittest()
-            parents = population.select_parents(4)
-            best_candidates[0].draw(window)
-            offspring_count = population_size - len(best_candidates)
-            offsprings = population.breed_new_solutions(parents,offspring_count)
-            next_generation = best_candidates + offsprings
-            population.population_list = next_generation
-            population.mutate(mutation_rate)
-            print(best_candidates[0].solution)
-            print("Iteration: " + str(iteration_counter), "Lowest score: " + str(best_candidates[0]))
-            iteration_counter += 1
     env.print_matrix()
     pygame.quit()
 
@@ -0,0 +1,129 @@
+import numpy as np
+
+"""Reading TSPLIB problem files and writing TSPLIB tour files.
+Headers are read line by line, the coordinate and edge weight sections are
+handed straight to NumPy's text parser so large instances never turn into
+per-line Python objects.
+"""
+
+COORDINATE_TYPES = ("EUC_2D", "CEIL_2D", "ATT", "GEO")
+MATRIX_FORMATS = ("FULL_MATRIX", "UPPER_ROW", "LOWER_DIAG_ROW")
+
+#Each function takes the coordinates of the nodes edges start from and of the nodes they end at
+#and returns the block of distances between them, rows are the start nodes
+
+def squared_euclidean(from_positions, to_positions):
+    deltas = from_positions[:, np.newaxis, :] - to_positions[np.newaxis, :, :]
+    return (deltas ** 2).sum(axis=2)
+
+def euclidean(from_positions, to_positions):
+    return np.sqrt(squared_euclidean(from_positions, to_positions))
+
+def euc_2d(from_positions, to_positions):
+    return np.floor(euclidean(from_positions, to_positions) + 0.5)
+
+def ceil_2d(from_positions, to_positions):
+    return np.ceil(euclidean(from_positions, to_positions))
+
+def att(from_positions, to_positions):
+    pseudo_distance = np.sqrt(squared_euclidean(from_positions, to_positions) / 10.0)
+    rounded = np.floor(pseudo_distance + 0.5)
+    return np.where(rounded < pseudo_distance, rounded + 1, rounded)
+
+def geo_radians(positions):
+    #Coordinates are DDD.MM latitude and longitude, converted exactly as the TSPLIB reference code does
+    degrees = np.trunc(positions)
+    return 3.141592 * (degrees + 5.0 * (positions - degrees) / 3.0) / 180.0
+
+def geo(from_positions, to_positions):
+    from_radians, to_radians = geo_radians(from_positions), geo_radians(to_positions)
+    q1 = np.cos(from_radians[:, np.newaxis, 1] - to_radians[np.newaxis, :, 1])
+    q2 = np.cos(from_radians[:, np.newaxis, 0] - to_radians[np.newaxis, :, 0])
+    q3 = np.cos(from_radians[:, np.newaxis, 0] + to_radians[np.newaxis, :, 0])
+    return np.floor(6378.388 * np.arccos(np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)) + 1.0)
+
+DISTANCE_FUNCTIONS = {"euclidean": euclidean, "EUC_2D": euc_2d, "CEIL_2D": ceil_2d, "ATT": att, "GEO": geo}
+
+def distances(from_positions, to_positions, edge_weight_type):
+    if edge_weight_type not in DISTANCE_FUNCTIONS:
+        raise ValueError("Unsupported edge weight type: " + str(edge_weight_type))
+    return DISTANCE_FUNCTIONS[edge_weight_type](np.asarray(from_positions, dtype=np.float64), np.asarray(to_positions, dtype=np.float64))
+
+def read_numbers(file, count):
+    #np.fromfile parses whitespace separated text in C and leaves the file positioned after the last number
+    numbers = np.fromfile(file, dtype=np.float64, sep=" ", count=count)
+    if len(numbers) != count:
+        raise ValueError("TSPLIB section ended after " + str(len(numbers)) + " of " + str(count) + " numbers")
+    return numbers
+
+def read_coordinates(file, dimension):
+    rows = read_numbers(file, dimension * 3).reshape(dimension, 3)
+    positions = np.empty((dimension, 2), dtype=np.float64)
+    positions[rows[:, 0].astype(np.intp) - 1] = rows[:, 1:]
+    return positions
+
+def read_edge_weights(file, dimension, edge_weight_format):
+    if edge_weight_format == "FULL_MATRIX":
+        return read_numbers(file, dimension * dimension).reshape(dimension, dimension)
+    matrix = np.zeros((dimension, dimension), dtype=np.float64)
+    if edge_weight_format == "UPPER_ROW":
+        rows, columns = np.triu_indices(dimension, 1)
+        matrix[rows, columns] = read_numbers(file, len(rows))
+    elif edge_weight_format == "LOWER_DIAG_ROW":
+        rows, columns = np.tril_indices(dimension)
+        matrix[rows, columns] = read_numbers(file, len(rows))
+    else:
+        raise ValueError("Unsupported TSPLIB edge weight format: " + str(edge_weight_format))
+    return np.maximum(matrix, matrix.T)
+
+def read_tsplib(path):
+    """Parses a TSPLIB .tsp file.
+
+    Returns a dict with the header fields (upper case keys), "positions" as a
+    (dimension, 2) array or None, and "distance_matrix" for EXPLICIT instances.
+    """
+    problem = {"positions": None, "distance_matrix": None}
+    with open(path, "rb") as file:
+        while True:
+            line = file.readline()
+            if not line:
+                break
+            line = line.decode("ascii", "replace").strip()
+            if not line:
+                continue
+            if line == "EOF":
+                break
+            if ":" in line:
+                key, value = line.split(":", 1)
+                problem[key.strip().upper()] = value.strip()
+                continue
+            section = line.upper()
+            dimension = int(problem["DIMENSION"])
+            if section in ("NODE_COORD_SECTION", "DISPLAY_DATA_SECTION"):
+                problem["positions"] = read_coordinates(file, dimension)
+            elif section == "EDGE_WEIGHT_SECTION":
+                problem["distance_matrix"] = read_edge_weights(file, dimension, problem.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX"))
+            else:
+                raise ValueError("Unsupported TSPLIB section: " + line)
+    edge_weight_type = problem.get("EDGE_WEIGHT_TYPE")
+    if edge_weight_type == "EXPLICIT":
+        if problem["distance_matrix"] is None:
+            raise ValueError("EXPLICIT TSPLIB instance without an EDGE_WEIGHT_SECTION")
+    elif edge_weight_type not in COORDINATE_TYPES:
+        raise ValueError("Unsupported TSPLIB edge weight type: " + str(edge_weight_type))
+    elif problem["positions"] is None:
+        raise ValueError("TSPLIB instance without a NODE_COORD_SECTION")
+    return problem
+
+def write_tour(path, tour, name, comment = None):
+    """Writes a tour of 0-based node IDs as a TSPLIB .tour file."""
+    tour = np.asarray(tour)
+    with open(path, "w") as file:
+        file.write("NAME : " + name + "\n")
+        if comment:
+            file.write("COMMENT : " + comment + "\n")
+        file.write("TYPE : TOUR\n")
+        file.write("DIMENSION : " + str(len(tour)) + "\n")
+        file.write("TOUR_SECTION\n")
+        np.savetxt(file, tour + 1, fmt="%d")
+        file.write("-1\nEOF\n")